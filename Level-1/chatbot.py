@@ -1,60 +1,31 @@
 import os
+import sys
 import textwrap
-import dotenv
-import google.generativeai as genai
 from termcolor import colored
-import time
 
-def configure_gemini():
-    try:
-        dotenv.load_dotenv()
+# Code shared by all three levels lives in common/ at the repository root.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("API key not found. Please set GEMINI_API_KEY in .env file or environment variables.")
-        
-        genai.configure(api_key=api_key)
-        model_name = 'models/gemini-1.5-pro'
+from common.gemini import GeminiClient
+from common.spinner import Spinner, print_streamed
 
-        model = genai.GenerativeModel(model_name)
-        model.generate_content("Test connection", request_options={"timeout": 5})
-        return model_name
-        
-    except Exception as e:
-        print(colored(f"Configuration error: {e}", 'red'))
-        return None
+SYSTEM_PROMPT = textwrap.dedent("""
+You are a helpful AI assistant that answers questions with clear explanations.
+Rules:
+1. Think step-by-step
+2. Refuse calculations
+3. Structure answers clearly
+4. Do not answer complex questions
+5. Do not answer multiple questions
+""")
 
-def get_llm_response(question, model_name):
-    """Get response with timeout and better error handling."""
-    try:
-        model = genai.GenerativeModel(model_name)
-        
-        system_prompt = textwrap.dedent("""
-        You are a helpful AI assistant that answers questions with clear explanations.
-        Rules:
-        1. Think step-by-step
-        2. Refuse calculations
-        3. Structure answers clearly
-        4. Do not answer complex questions
-        5. Do not answer multiple questions
-        """)
-        
-        response = model.generate_content(
-            system_prompt + question,
-            request_options={"timeout": 10}
-        )
-        
-        if not response.text:
-            raise ValueError("Received empty response from API")
-            
-        return response.text
-        
-    except Exception as e:
-        raise Exception(f"API Error: {str(e)}")
+gemini = GeminiClient(SYSTEM_PROMPT)
 
 def main():
-    model_name = configure_gemini()
-    if not model_name:
+    try:
+        model_name = gemini.configure_from_env()
+    except Exception as e:
+        print(colored(f"Configuration error: {e}", 'red'))
         return
         
     while True:
@@ -65,22 +36,26 @@ def main():
                 print(colored("\nGoodbye!", 'magenta'))
                 break
                 
+            if question.strip() == '/cache':
+                stats = gemini.response_cache.stats()
+                print(colored(f"\nCache: {stats['hits']} hits, {stats['misses']} misses, "
+                              f"{stats['size']} entries ({stats['hit_rate']:.0%} hit rate)", 'cyan'))
+                continue
+
+            if question.strip() == '/tokens':
+                print(colored("\n" + gemini.token_usage.format(), 'cyan'))
+                continue
+                
             if not question.strip():
                 continue
                 
-            print(colored("\nThinking...", 'yellow'), end='', flush=True)
+            spinner = Spinner().start()
             
             try:
-                spinner = ['|', '/', '-', '\\']
-                for i in range(20):
-                    print(f"\b{spinner[i % 4]}", end='', flush=True)
-                    time.sleep(0.25)
-                    
-                response = get_llm_response(question, model_name)
-                print("\b" + colored("\nAssistant:", 'green'))
-                print(response)
+                print_streamed(gemini.stream(question, model_name), spinner)
                 
             except Exception as e:
+                spinner.stop()
                 print("\b" + colored(f"\nError: {e}", 'red'))
                 print("Please try again or check your connection.")
                 
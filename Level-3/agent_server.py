@@ -0,0 +1,265 @@
+"""HTTP server exposing the Level-3 agent to many concurrent sessions.
+
+POST /ask    {"session": "...", "question": "..."} -> {"session", "steps": [...]}
+POST /reset  {"session": "..."} forgets a session's conversation memory
+GET  /stats  metrics snapshot (see metrics.py), session count, token usage and tool costs
+"""
+import argparse
+import asyncio
+import json
+import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from termcolor import colored
+
+import full_agent as agent  # also puts common/ on sys.path
+from common.response_cache import ResponseCache
+from memory import ConversationMemory
+from metrics import METRICS
+from resilience import Deadline, DeadlineExceeded
+from singleflight import SingleFlight
+from tools import TOOLS
+from translator_tool import translate_many
+
+MAX_BODY = 64 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+class Session:
+    __slots__ = ("memory", "lock")
+
+    def __init__(self):
+        self.memory = ConversationMemory(
+            max_records=int(os.getenv("MEMORY_RECORDS", "50")),
+            context_tokens=int(os.getenv("CONTEXT_TOKENS", "800")),
+        )
+        self.lock = asyncio.Lock()
+
+class AgentServer:
+    """Answers questions for many sessions from one event loop.
+
+    Gemini calls use generate_content_async. googletrans only has a
+    blocking client, so translations run on a bounded thread pool. At most
+    `max_turns` turns are answered at once and the rest queue. Each session
+    has its own ConversationMemory, and its turns run one at a time. The
+    least recently used session is dropped beyond `max_sessions`. Steps
+    still running at agent.turn_deadline are cancelled and reported as
+    errors next to the steps that finished. Gemini requests are capped at
+    the time the turn has left and stop retrying once no turn waits for them.
+    """
+
+    def __init__(self, model_name, workers=16, max_turns=64, max_sessions=1000):
+        self.model_name = model_name
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.turns = asyncio.Semaphore(max_turns)
+        self.flight = SingleFlight()
+
+    def session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.sessions[session_id] = Session()
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        self.sessions.move_to_end(session_id)
+        return session
+
+    async def generate(self, prompt, deadline=None):
+        """One Gemini request through agent.llm_caller: retries, rate limiting and hedging."""
+        try:
+            return await agent.llm_caller.call_async(self.request, prompt, deadline=deadline)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise Exception(f"API Error: {str(e)}")
+
+    async def request(self, prompt, deadline=None):
+        timeout = 10 if deadline is None else min(10, deadline.remaining())
+        if timeout <= 0:
+            deadline.check()
+        with METRICS.timer("llm.request"):
+            response = await asyncio.wait_for(agent.gemini.model(self.model_name).generate_content_async(
+                prompt, request_options={"timeout": timeout}), timeout=timeout)
+        agent.token_usage.record(response)
+        if not response.text:
+            raise ValueError("Received empty response from API")
+        return response.text
+
+    async def llm_step(self, question, context, deadline):
+        # The index is shared by all sessions, so only context-free answers go in.
+        match = None if context else agent.answer_index.lookup(question)
+        if match:
+            METRICS.incr("llm.index_hits")
+            return match[0]
+        key = ResponseCache.make_key(question, self.model_name, agent.SYSTEM_PROMPT + context)
+        text = agent.response_cache.get(key)
+        if text is None:
+            text = await self.flight.do_async(key, self.generate, context + question, deadline=deadline)
+            agent.response_cache.set(key, text)
+        else:
+            METRICS.incr("llm.cache_hits")
+        if not context:
+            agent.answer_index.add(question, text)
+        return text
+
+    async def run_step(self, tool, step_content, context, translations, deadline):
+        # The built-in translator and assistant have async paths here; any
+        # other registered tool, including one that replaces them, runs as
+        # registered: inline if it is cheap and local, else on the thread pool.
+        if tool is agent.TRANSLATOR:
+            return agent.translation_entry(step_content, (await translations)[step_content])
+        if tool is agent.ASSISTANT:
+            return {"query": step_content, "response": await self.llm_step(step_content, context, deadline),
+                    "source": "Assistant"}
+        if tool.inline:
+            return tool.call(step_content, self.model_name, context, deadline)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, tool.call, step_content, self.model_name, context,
+                                          deadline)
+
+    async def translate(self, texts, deadline):
+        loop = asyncio.get_running_loop()
+        return dict(zip(texts, await loop.run_in_executor(self.executor, translate_many, texts, deadline)))
+
+    async def answer(self, session, question):
+        """Answer one turn like full_agent.run_turn, recording steps in the session's memory."""
+        async with session.lock:
+            async with self.turns:
+                with METRICS.timer("server.turn"):
+                    deadline = Deadline(agent.turn_deadline)
+                    steps = agent.identify_steps(question)
+                    context = session.memory.build_context(question)
+                    tools = [TOOLS.find(kind) for kind, _ in steps]
+                    texts = list(dict.fromkeys(content for tool, (_, content) in zip(tools, steps)
+                                               if tool is agent.TRANSLATOR))
+                    translations = asyncio.ensure_future(self.translate(texts, deadline)) if texts else None
+                    tasks = [asyncio.ensure_future(self.run_step(tool, content, context, translations, deadline))
+                             for tool, (_, content) in zip(tools, steps)]
+                    pending = ()
+                    if tasks:
+                        _, pending = await asyncio.wait(tasks, timeout=deadline.timeout())
+                    for task in pending:
+                        task.cancel()
+                    if pending:
+                        METRICS.incr("server.deadline_drops", len(pending))
+            results = []
+            for (step_type, step_content), task in zip(steps, tasks):
+                if task in pending:
+                    outcome = DeadlineExceeded(f"Turn deadline of {agent.turn_deadline:g}s exceeded")
+                else:
+                    outcome = task.exception() or task.result()
+                if isinstance(outcome, Exception):
+                    results.append({"type": step_type, "query": step_content, "error": str(outcome)})
+                else:
+                    session.memory.append(outcome)
+                    results.append({"type": step_type, **outcome})
+            return results
+
+    async def route(self, method, path, body):
+        if path == "/stats":
+            if method != "GET":
+                return 405, {"error": "Use GET"}
+            return 200, {**METRICS.snapshot(), "sessions": len(self.sessions), "tokens": agent.token_usage.stats(),
+                         "tools": TOOLS.costs()}
+        if path not in ("/ask", "/reset"):
+            return 404, {"error": f"Unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        if not isinstance(request, dict):
+            return 400, {"error": "Expected a JSON object"}
+        session_id = str(request.get("session") or uuid.uuid4().hex)
+        if path == "/reset":
+            self.sessions.pop(session_id, None)
+            return 200, {"session": session_id}
+        question = request.get("question")
+        if not isinstance(question, str) or not question.strip():
+            return 400, {"error": "question must be a non-empty string"}
+        return 200, {"session": session_id, "steps": await self.answer(self.session(session_id), question)}
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, keeping it alive between them."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = headers.get("content-length") or "0"
+                # Without a usable length the body cannot be found, so the
+                # connection is closed after the error.
+                if not (length.isascii() and length.isdigit()):
+                    status, payload = 400, {"error": "Invalid Content-Length header"}
+                    keep_alive = False
+                elif int(length) > MAX_BODY:
+                    status, payload = 413, {"error": "Request body too large"}
+                    keep_alive = False
+                else:
+                    length = int(length)
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = await self.route(method, path.split("?", 1)[0], body)
+                    except Exception as e:
+                        status, payload = 500, {"error": str(e)}
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                             + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host, port, server):
+    listener = await asyncio.start_server(server.handle, host, port, backlog=1024)
+    print(colored(f"Agent server listening on http://{host}:{port}", 'green'))
+    async with listener:
+        await listener.serve_forever()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the Level-3 agent over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=16, help="threads for blocking translation calls")
+    parser.add_argument("--max-turns", type=int, default=64, help="turns answered at once; others queue")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="sessions kept in memory")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    model_name = agent.configure_gemini()
+    if not model_name:
+        return
+    try:
+        agent.gemini.wait_for_warm_up()
+    except ValueError as e:
+        print(colored(str(e), 'red'))
+        return
+    try:
+        asyncio.run(serve(args.host, args.port, AgentServer(model_name, args.workers, args.max_turns,
+                                                          args.max_sessions)))
+    except KeyboardInterrupt:
+        print(colored("\nServer stopped.", 'magenta'))
+
+if __name__ == "__main__":
+    main()
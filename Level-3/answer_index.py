@@ -0,0 +1,159 @@
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, deque
+from itertools import chain
+
+def _grams(text):
+    """Character trigrams of the normalized text, padded so word edges count."""
+    normalized = " " + " ".join(re.findall(r"[a-z0-9]+", text.lower())) + " "
+    return frozenset(normalized[i:i + 3] for i in range(len(normalized) - 2))
+
+# Words that change how a question is phrased but not what it asks.
+_FILLER_WORDS = frozenset("""
+a an the of is are was were be what whats s who how why which me tell about please can could would
+you explain describe give i my do does in on at to for and
+""".split())
+
+def _content_words(text):
+    # A tuple, not a set: trigram similarity ignores word order, so this is
+    # what tells "10 km to miles" from "10 miles to km".
+    return tuple(word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in _FILLER_WORDS)
+
+class AnswerIndex:
+    """TF-IDF index over character trigrams of past questions.
+
+    lookup() finds the stored question most similar to a new one (cosine
+    similarity of IDF-weighted trigram sets) so near-paraphrases can be
+    answered without calling the LLM. A match must also have the same
+    content words in the same order, so "capital of Nigeria" never gets
+    Niger's answer and "Is Java faster than Python?" never gets the
+    answer to "Is Python faster than Java?".
+    Candidates come from the posting lists of the query's rarest trigrams
+    only, which keeps lookups well under a millisecond at 100k entries.
+    Beyond `max_entries` the oldest entries are dropped. With a path,
+    every add() is appended to a JSONL file that is replayed on startup.
+    """
+
+    def __init__(self, path=None, threshold=0.75, max_entries=10000, probe_grams=6, max_candidates=16):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.probe_grams = probe_grams
+        self.max_candidates = max_candidates
+        # doc id -> (query, response, grams, content words, normalized query),
+        # oldest first. Ids only grow, so each posting list is oldest first too.
+        self._entries = {}
+        self._next_id = 0
+        self._queries = set()
+        self._postings = {}
+        # Document norms depend on IDF, which drifts slowly as entries come
+        # and go; cached norms are dropped after a 10% turnover.
+        self._norms = {}
+        self._changes = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    @classmethod
+    def from_env(cls):
+        """Build an index from ANSWER_INDEX_FILE, ANSWER_INDEX_THRESHOLD and ANSWER_INDEX_SIZE."""
+        return cls(
+            path=os.getenv("ANSWER_INDEX_FILE") or None,
+            threshold=float(os.getenv("ANSWER_INDEX_THRESHOLD", "0.75")),
+            max_entries=int(os.getenv("ANSWER_INDEX_SIZE", "10000")),
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _idf(self, gram):
+        return math.log((len(self._entries) + 1) / (len(self._postings.get(gram, ())) + 1)) + 1
+
+    def _index(self, query, response):
+        """Index one pair; returns False if the same question is already stored."""
+        normalized = " ".join(query.lower().split())
+        if normalized in self._queries or self.max_entries <= 0:
+            return False
+        self._queries.add(normalized)
+        grams = _grams(query)
+        doc_id = self._next_id
+        self._next_id += 1
+        self._entries[doc_id] = (query, response, grams, _content_words(query), normalized)
+        for gram in grams:
+            self._postings.setdefault(gram, deque()).append(doc_id)
+        self._changes += 1
+        while len(self._entries) > self.max_entries:
+            self._evict_oldest()
+        return True
+
+    def _evict_oldest(self):
+        doc_id = next(iter(self._entries))
+        _, _, grams, _, normalized = self._entries.pop(doc_id)
+        self._queries.discard(normalized)
+        self._norms.pop(doc_id, None)
+        for gram in grams:
+            postings = self._postings[gram]
+            postings.popleft()
+            if not postings:
+                del self._postings[gram]
+        self._changes += 1
+
+    def add(self, query, response):
+        with self._lock:
+            if self._index(query, response) and self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"query": query, "response": response}, ensure_ascii=False) + "\n")
+
+    def lookup(self, query):
+        """Return (response, matched_query, score) for the best match above the threshold, else None."""
+        grams = _grams(query)
+        words = _content_words(query)
+        with self._lock:
+            if not self._entries or not grams:
+                return None
+            known = [gram for gram in grams if gram in self._postings]
+            rarest = heapq.nsmallest(self.probe_grams, known, key=lambda gram: len(self._postings[gram]))
+            hits = Counter(chain.from_iterable(self._postings[gram] for gram in rarest))
+            candidates = [doc_id for doc_id, _ in hits.most_common(self.max_candidates)]
+
+            if self._changes > len(self._entries) * 0.1:
+                self._norms = {}
+                self._changes = 0
+            idf = {gram: self._idf(gram) for gram in grams}
+            query_norm = math.sqrt(sum(weight * weight for weight in idf.values()))
+            best = None
+            for doc_id in candidates:
+                stored_query, response, doc_grams, doc_words, _ = self._entries[doc_id]
+                if doc_words != words:
+                    continue
+                dot = sum(idf[gram] ** 2 for gram in doc_grams & grams)
+                doc_norm = self._norms.get(doc_id)
+                if doc_norm is None:
+                    doc_norm = math.sqrt(sum(self._idf(gram) ** 2 for gram in doc_grams))
+                    self._norms[doc_id] = doc_norm
+                score = dot / (query_norm * doc_norm)
+                if best is None or score > best[2]:
+                    best = (response, stored_query, score)
+        if best and best[2] >= self.threshold:
+            return best
+        return None
+
+    def _load(self):
+        lines = 0
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    record = json.loads(line)
+                    self._index(record["query"], record["response"])
+                except (ValueError, KeyError):
+                    continue
+        if lines > len(self._entries):
+            # Rewrite the file with only the entries kept, so it stays bounded too.
+            with open(self.path, "w", encoding="utf-8") as f:
+                for query, response, _, _, _ in self._entries.values():
+                    f.write(json.dumps({"query": query, "response": response}, ensure_ascii=False) + "\n")
@@ -1,135 +1,447 @@
 import os
+import sys
 import textwrap
-import dotenv
-import google.generativeai as genai
 from termcolor import colored
+import json
+import argparse
+import datetime
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, InvalidStateError, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+# Code shared by all three levels lives in common/ at the repository root.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from common.gemini import GeminiClient
+from common.response_cache import ResponseCache
+from common.spinner import Spinner
+from memory import ConversationMemory
+from answer_index import AnswerIndex
+from metrics import METRICS, instrument
+from resilience import Deadline, DeadlineExceeded, ResilientCaller
+from singleflight import SingleFlight
+from tools import TOOLS, Tool
 import time
-import re
-from calculator_tool import parse_and_calculate, is_math_question, CalculatorError
-from translator_tool import translate_to_german, is_translation_request, extract_text_to_translate, TranslationError
+from calculator_tool import parse_and_calculate, CalculatorError
+from planner import calculation_segments, calculation_steps, plan_steps, translation_steps
+from translator_tool import translate_to_german, translate_many, TranslationError
+
+# Bounded: old steps fold into a short summary instead of piling up.
+conversation_memory = ConversationMemory(
+    max_records=int(os.getenv("MEMORY_RECORDS", "50")),
+    context_tokens=int(os.getenv("CONTEXT_TOKENS", "800")),
+)
+
+# Steps of one turn are independent, so network-bound ones are sent together.
+step_executor = ThreadPoolExecutor(max_workers=8)
+
+SYSTEM_PROMPT = textwrap.dedent("""
+You are a helpful AI assistant that answers questions with clear explanations.
+Rules:
+1. Think step-by-step
+2. Refuse calculations
+3. Structure answers clearly
+4. Do not answer complex questions
+5. Do not answer multiple questions
+""")
+
+# The system prompt of a fused request. Rule 5 of SYSTEM_PROMPT would have
+# the model refuse the numbered list, and that refusal would then be cached
+# and indexed as the answer to every question in it.
+FUSED_SYSTEM_PROMPT = textwrap.dedent("""
+You are a helpful AI assistant that answers questions with clear explanations.
+Rules:
+1. Think step-by-step
+2. Refuse calculations
+3. Structure answers clearly
+4. Do not answer complex questions
+5. You may get several numbered questions at once; answer each one on its own
+""")
 
-conversation_memory = []
+# Appended when several LLM steps of a turn are sent as one request.
+FUSED_PROMPT = textwrap.dedent("""
+You will now get several independent questions at once. Answer each one
+on its own, following your instructions, as if it had been asked alone.
+Reply with JSON only: {"answers": ["answer to 1", "answer to 2", ...]},
+exactly one string per question, in order.
+
+""")
+
+answer_index = AnswerIndex()
+# Identical questions asked at the same moment share one Gemini call.
+llm_flight = SingleFlight()
+fuse_llm_steps = True
+# Seconds a turn may take before its unfinished steps are dropped.
+turn_deadline = 30.0
+
+def cached_model(genai, model_name):
+    """With GEMINI_CONTEXT_CACHE=1, build a model on a CachedContent holding
+    the system prompt; otherwise, or if the API refuses, return None.
+
+    Context caching needs an explicit model version (e.g.
+    models/gemini-1.5-pro-002) and has a minimum size of 32k tokens, so a
+    short system prompt is refused. The caller then uses system_instruction.
+    """
+    if os.getenv("GEMINI_CONTEXT_CACHE", "").lower() not in ("1", "true", "yes", "on"):
+        return None
+    try:
+        ttl = datetime.timedelta(seconds=float(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600")))
+        cache = genai.caching.CachedContent.create(model=model_name, system_instruction=SYSTEM_PROMPT, ttl=ttl)
+        return genai.GenerativeModel.from_cached_content(cache)
+    except Exception:
+        return None
+
+gemini = GeminiClient(SYSTEM_PROMPT, make_model=cached_model)
+response_cache = gemini.response_cache
+token_usage = gemini.token_usage
 
 def configure_gemini():
+    global response_cache, answer_index, llm_caller, fuse_llm_steps, turn_deadline
     try:
-        dotenv.load_dotenv()
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("API key not found. Please set GEMINI_API_KEY in .env file or environment variables.")
-        genai.configure(api_key=api_key)
-        model_name = 'models/gemini-1.5-pro'
-        model = genai.GenerativeModel(model_name)
-        model.generate_content("Test connection", request_options={"timeout": 5})
+        model_name = gemini.configure_from_env()
+        response_cache = gemini.response_cache
+        answer_index = AnswerIndex.from_env()
+        METRICS.configure_from_env()
+        llm_caller = ResilientCaller.from_env(generate)
+        fuse_llm_steps = os.getenv("LLM_FUSE", "1") != "0"
+        turn_deadline = float(os.getenv("TURN_DEADLINE", "30")) or None
         return model_name
     except Exception as e:
         print(colored(f"Configuration error: {e}", 'red'))
         return None
 
-def get_llm_response(question, model_name):
+def generate(model_name, prompt, generation_config=None, deadline=None, system_prompt=None):
+    """Make one Gemini request; llm_caller adds retries, rate limiting and hedging."""
+    timeout = 10 if deadline is None else min(10, deadline.remaining())
+    if timeout <= 0:
+        deadline.check()
+    with METRICS.timer("llm.request"):
+        response = gemini.model(model_name, system_prompt).generate_content(
+            prompt, generation_config=generation_config, request_options={"timeout": timeout})
+    token_usage.record(response)
+    if not response.text:
+        raise ValueError("Received empty response from API")
+    return response.text
+
+llm_caller = ResilientCaller(generate)
+
+@instrument("llm")
+def get_llm_response(question, model_name, context="", deadline=None):
+    key = ResponseCache.make_key(question, model_name, SYSTEM_PROMPT + context)
+    cached = response_cache.get(key)
+    if cached is not None:
+        METRICS.incr("llm.cache_hits")
+        return cached
+    try:
+        gemini.wait_for_warm_up()
+        text = llm_flight.do(key, llm_caller, model_name, context + question, deadline=deadline)
+        response_cache.set(key, text)
+        return text
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        raise Exception(f"API Error: {str(e)}")
+
+def parse_fused_answers(text, count):
+    """Return the `count` answers of a fused reply, or None if it breaks the JSON contract."""
+    try:
+        answers = json.loads(text)["answers"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(answers, list) or len(answers) != count:
+        return None
+    if not all(isinstance(answer, str) and answer.strip() for answer in answers):
+        return None
+    return answers
+
+@instrument("llm.fused")
+def get_llm_responses(questions, model_name, context="", deadline=None):
+    """Answer several LLM steps of one turn with a single Gemini request.
+
+    Answers already in the answer index or response cache are reused, and
+    the rest are asked together under FUSED_PROMPT. Returns one answer per
+    question. An answer is None when there was nothing to fuse or the reply
+    could not be parsed; the caller then asks that step on its own.
+    """
+    answers = [None] * len(questions)
+    missing = []
+    for i, question in enumerate(questions):
+        match = None if context else answer_index.lookup(question)
+        cached = None if match else response_cache.get(
+            ResponseCache.make_key(question, model_name, SYSTEM_PROMPT + context))
+        if match:
+            METRICS.incr("llm.index_hits")
+            answers[i] = match[0]
+        elif cached is not None:
+            METRICS.incr("llm.cache_hits")
+            answers[i] = cached
+        else:
+            missing.append(i)
+    if len(missing) < 2:
+        return answers
+
+    numbered = "\n".join(f"{n}. {questions[i]}" for n, i in enumerate(missing, 1))
     try:
-        model = genai.GenerativeModel(model_name)
-        system_prompt = textwrap.dedent("""
-        You are a helpful AI assistant that answers questions with clear explanations.
-        Rules:
-        1. Think step-by-step
-        2. Refuse calculations
-        3. Structure answers clearly
-        4. Do not answer complex questions
-        5. Do not answer multiple questions
-        """)
-        response = model.generate_content(
-            system_prompt + question,
-            request_options={"timeout": 10}
-        )
-        if not response.text:
-            raise ValueError("Received empty response from API")
-        return response.text
+        gemini.wait_for_warm_up()
+        text = llm_caller(model_name, context + FUSED_PROMPT + numbered, deadline=deadline,
+                          generation_config={"response_mime_type": "application/json"},
+                          system_prompt=FUSED_SYSTEM_PROMPT)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise Exception(f"API Error: {str(e)}")
+    fused = parse_fused_answers(text, len(missing))
+    if fused is None:
+        METRICS.incr("llm.fused_fallbacks")
+        return answers
+    for i, answer in zip(missing, fused):
+        answers[i] = answer
+        response_cache.set(ResponseCache.make_key(questions[i], model_name, SYSTEM_PROMPT + context), answer)
+        if not context:
+            answer_index.add(questions[i], answer)
+    return answers
 
 def extract_calculation_segments(query):
-    segments = []
-    
-    patterns = [
-        # Addition patterns
-        r'(?:add|sum|plus)\s+([\d.]+)\s+(?:and|to|with)\s+([\d.]+)',
-        r'([\d.]+)\s*\+\s*([\d.]+)',
-        
-        # Subtraction patterns
-        r'(?:subtract|minus)\s+([\d.]+)\s+(?:from)\s+([\d.]+)',
-        r'(?:subtract|minus)\s+([\d.]+)\s+(?:and|to|with)\s+([\d.]+)',
-        r'([\d.]+)\s*\-\s*([\d.]+)',
-        
-        # Multiplication patterns
-        r'(?:multiply|times)\s+([\d.]+)\s+(?:and|by|with)\s+([\d.]+)',
-        r'([\d.]+)\s*(?:\*|x|×)\s*([\d.]+)',
-        
-        # Division patterns
-        r'(?:divide)\s+([\d.]+)\s+(?:by|with)\s+([\d.]+)',
-        r'([\d.]+)\s*\/\s*([\d.]+)'
-    ]
-    
-    all_matches = []
-    for pattern in patterns:
-        matches = re.finditer(pattern, query, re.IGNORECASE)
-        for match in matches:
-            all_matches.append((match.start(), match.group(0)))
-    
-    all_matches.sort(key=lambda x: x[0])
-    
-    for _, match_text in all_matches:
-        segments.append(match_text)
-    
-    if not segments:
-        potential_segments = re.split(r'(?<=\d)\s+and\s+(?=\d|add|subtract|multiply|divide)', query)
-        segments = [seg.strip() for seg in potential_segments if is_math_question(seg)]
-    
-    if not segments and is_math_question(query):
-        segments = [query]
-    
-    return segments
+    return calculation_segments(query)
 
 def identify_steps(question):
-    steps = []
-    
-    explicit_parts = re.split(r',\s*|\s+and\s+then\s+|\s+then\s+', question)
-    
-    if len(explicit_parts) > 1:
-        for part in explicit_parts:
-            part = part.strip()
-            if not part:
+    return plan_steps(question)
+
+def translation_entry(text, german_text):
+    return {
+        "query": f"Translate '{text}' to German",
+        "response": f"'{text}' in German is: '{german_text}'",
+        "source": "Translator"
+    }
+
+def calculate_step(step_content, model_name, context="", deadline=None):
+    return {
+        "query": step_content,
+        "response": f"The final answer is: {parse_and_calculate(step_content)}",
+        "source": "Calculator"
+    }
+
+def translate_step(step_content, model_name, context="", deadline=None):
+    return translation_entry(step_content, translate_to_german(step_content, deadline))
+
+def translate_steps(texts, model_name, context="", deadline=None):
+    return [translation_entry(text, german_text) for text, german_text in zip(texts, translate_many(texts, deadline))]
+
+def llm_step(step_content, model_name, context="", deadline=None):
+    # A close paraphrase of an earlier question is answered locally. Answers
+    # given with conversation context depend on it, so they skip the index.
+    match = None if context else answer_index.lookup(step_content)
+    if match:
+        METRICS.incr("llm.index_hits")
+        llm_response = match[0]
+    else:
+        llm_response = get_llm_response(step_content, model_name, context, deadline)
+        if not context:
+            answer_index.add(step_content, llm_response)
+    return {
+        "query": step_content,
+        "response": llm_response,
+        "source": "Assistant"
+    }
+
+def llm_steps(questions, model_name, context="", deadline=None):
+    answers = get_llm_responses(questions, model_name, context, deadline)
+    return [None if answer is None else {"query": question, "response": answer, "source": "Assistant"}
+            for question, answer in zip(questions, answers)]
+
+# Registered in the order their matchers are tried, which is also the
+# order their steps come in. Costs are starting guesses in seconds; each
+# tool learns its own from there. The assistant takes everything else.
+TRANSLATOR = TOOLS.register(Tool("translate", "Translator", translate_step, errors=TranslationError, cost=0.4,
+                                 color='cyan', matches=translation_steps, run_many=translate_steps,
+                                 batch_if=lambda count: True))
+CALCULATOR = TOOLS.register(Tool("calculate", "Calculator", calculate_step, errors=CalculatorError,
+                                 local=True, cost=0.0005, color='cyan', matches=calculation_steps))
+ASSISTANT = TOOLS.register(Tool("llm", "Assistant", llm_step, cost=1.5, run_many=llm_steps,
+                                batch_if=lambda count: fuse_llm_steps and count > 1), default=True)
+
+def run_step(step_type, step_content, model_name, context="", deadline=None):
+    """Run a single step with its tool and return its conversation_memory entry."""
+    return TOOLS.find(step_type).call(step_content, model_name, context, deadline)
+
+def _settle(future, compute):
+    """Resolve a derived step future with compute(), unless the turn already cancelled it."""
+    try:
+        try:
+            result = compute()
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+def _batched_future(batch, index, tool, step_content, model_name, context, executor, deadline):
+    """Derive one step's entry from its tool's batched request, or run the step alone."""
+    future = Future()
+
+    def on_done(batch):
+        if not batch.cancelled() and batch.exception() is None and batch.result()[index] is None:
+            step = executor.submit(tool.call, step_content, model_name, context, deadline)
+            step.add_done_callback(lambda step: _settle(future, step.result))
+        else:
+            _settle(future, lambda: batch.result()[index])
+
+    batch.add_done_callback(on_done)
+    return future
+
+def submit_steps(steps, model_name, executor=None, context="", deadline=None):
+    """Start every step of a turn at once, each with the tool in TOOLS that matches it.
+
+    Remote tools are sent first, costliest first, and a tool that can
+    batch gets one request for all its steps. Cheap local tools then run
+    right here, so their answers are ready before any remote one.
+    `context` is prepended to LLM prompts. Steps that have not started by
+    the time `deadline` runs out do nothing. Returns one future per step,
+    in step order.
+    """
+    executor = executor or step_executor
+    groups = {}
+    for i, (step_type, step_content) in enumerate(steps):
+        groups.setdefault(TOOLS.find(step_type), []).append(i)
+    futures = [None] * len(steps)
+    for tool in sorted(groups, key=lambda tool: (tool.inline, -tool.cost)):
+        indices = groups[tool]
+        contents = [steps[i][1] for i in indices]
+        if tool.inline:
+            for i, step_content in zip(indices, contents):
+                futures[i] = Future()
+                _settle(futures[i], lambda: tool.call(step_content, model_name, context, deadline))
+        elif tool.run_many and tool.batch_if(len(indices)):
+            batch = executor.submit(tool.call_many, contents, model_name, context, deadline)
+            for index, (i, step_content) in enumerate(zip(indices, contents)):
+                futures[i] = _batched_future(batch, index, tool, step_content, model_name, context,
+                                             executor, deadline)
+        else:
+            for i, step_content in zip(indices, contents):
+                futures[i] = executor.submit(tool.call, step_content, model_name, context, deadline)
+    return futures
+
+def as_finished(futures, deadline):
+    """Yield (step index, future) as steps finish; steps done together come in step order.
+
+    Once the deadline passes, the unfinished steps are yielded as well, so
+    step_result reports them as timed out.
+    """
+    pending = {future: i for i, future in enumerate(futures)}
+    while pending:
+        done, _ = wait(pending, timeout=deadline.timeout(), return_when=FIRST_COMPLETED)
+        for future in sorted(done or pending, key=pending.get):
+            yield pending.pop(future), future
+
+def step_result(future, deadline):
+    """Wait for a step within the turn's deadline; DeadlineExceeded if it is not done in time."""
+    try:
+        return future.result(timeout=deadline.timeout())
+    except (FutureTimeout, CancelledError):
+        deadline.check()
+        raise
+
+def drop_steps(futures, deadline):
+    """End the turn: steps not yet started skip their work, and unfinished ones are cancelled."""
+    deadline.cancel()
+    for future in futures:
+        future.cancel()
+
+def run_turn(question, model_name, executor=None, deadline=None):
+    """Answer one question without printing; errors are reported per step.
+
+    Steps not done by the deadline (TURN_DEADLINE by default) come back
+    as errors, next to the results that were finished in time.
+    """
+    deadline = deadline or Deadline(turn_deadline)
+    steps = identify_steps(question)
+    futures = submit_steps(steps, model_name, executor, deadline=deadline)
+    results = []
+    for (step_type, step_content), future in zip(steps, futures):
+        try:
+            results.append({"type": step_type, **step_result(future, deadline)})
+        except Exception as e:
+            results.append({"type": step_type, "query": step_content, "error": str(e)})
+    drop_steps(futures, deadline)
+    return results
+
+def read_questions(path):
+    """Yield one {"id", "question"} record per line of a JSONL file, lazily."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
                 continue
-                
-            if is_translation_request(part):
-                text_to_translate = extract_text_to_translate(part)
-                if text_to_translate:
-                    steps.append(("translate", text_to_translate))
-            elif is_math_question(part):
-                calc_segments = extract_calculation_segments(part)
-                for segment in calc_segments:
-                    steps.append(("calculate", segment))
+            try:
+                record = json.loads(line)
+                record_id, question = record.get("id", line_number), record["question"]
+            except (ValueError, KeyError, AttributeError) as e:
+                yield {"id": line_number, "question": None, "error": f"Invalid input line: {e}"}
+                continue
+            if not isinstance(question, str) or not question.strip():
+                yield {"id": record_id, "question": question, "error": "question must be a non-empty string"}
             else:
-                steps.append(("llm", part))
-    else:
-        if is_translation_request(question):
-            text_to_translate = extract_text_to_translate(question)
-            if text_to_translate:
-                steps.append(("translate", text_to_translate))
-
-        if is_math_question(question):
-            calc_segments = extract_calculation_segments(question)
-            for segment in calc_segments:
-                steps.append(("calculate", segment))
-
-        if not steps:
-            steps.append(("llm", question))
-    
-    return steps
+                yield {"id": record_id, "question": question}
+
+def answer_record(record, model_name, executor):
+    """Answer one input record; a failure is reported on the record instead of ending the run."""
+    if "error" in record:
+        return record
+    try:
+        return {**record, "steps": run_turn(record["question"], model_name, executor)}
+    except Exception as e:
+        return {**record, "error": f"Turn failed: {e}"}
+
+def run_batch(in_path, out_path, model_name, concurrency=8):
+    """Stream questions from in_path and write answers to out_path as they finish.
+
+    At most `concurrency` questions are in flight, so memory stays flat
+    however large the input is. Output lines are in completion order and
+    carry the input id.
+    """
+    count = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as turn_pool, \
+            ThreadPoolExecutor(max_workers=concurrency * 4) as step_pool, \
+            open(out_path, "w", encoding="utf-8") as out:
+
+        def write(done):
+            nonlocal count
+            for future in done:
+                out.write(json.dumps(future.result(), ensure_ascii=False) + "\n")
+                count += 1
+            out.flush()
+
+        pending = set()
+        for record in read_questions(in_path):
+            if len(pending) >= concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                write(done)
+            pending.add(turn_pool.submit(answer_record, record, model_name, step_pool))
+        write(wait(pending).done)
+    print(colored(f"Wrote {count} answers to {out_path}", 'green'))
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Level-3 agent: calculator, translator and Gemini.")
+    parser.add_argument("--batch", metavar="IN_JSONL",
+                        help='answer {"id", "question"} lines from a JSONL file instead of the prompt')
+    parser.add_argument("--out", metavar="OUT_JSONL", help="where --batch writes its answers")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="questions answered at once in --batch mode (default: 8)")
+    args = parser.parse_args(argv)
+    if args.batch and not args.out:
+        parser.error("--batch requires --out")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
     model_name = configure_gemini()
     if not model_name:
         return
+
+    if args.batch:
+        run_batch(args.batch, args.out, model_name, args.concurrency)
+        return
     
     while True:
         try:
@@ -137,68 +449,88 @@ def main():
             if question.lower() in ['exit', 'quit', 'q']:
                 print(colored("\nGoodbye!", 'magenta'))
                 break
+            if question.strip() == '/cache':
+                stats = response_cache.stats()
+                print(colored(f"\nCache: {stats['hits']} hits, {stats['misses']} misses, "
+                              f"{stats['size']} entries ({stats['hit_rate']:.0%} hit rate)", 'cyan'))
+                continue
+            if question.strip() == '/tokens':
+                print(colored("\n" + token_usage.format(), 'cyan'))
+                continue
+            if question.strip() == '/tools':
+                print(colored("\n" + TOOLS.format(), 'cyan'))
+                continue
+            if question.strip() == '/stats':
+                if METRICS.enabled:
+                    print(colored("\n" + METRICS.format(), 'cyan'))
+                else:
+                    print(colored("\nMetrics are off. Set METRICS=1 to record them.", 'cyan'))
+                continue
             if not question.strip():
                 continue
                 
-            print(colored("\nThinking...", 'yellow'), end='', flush=True)
+            turn_start = time.perf_counter()
+            spinner = Spinner().start()
+            deadline = Deadline(turn_deadline)
+            futures = []
+            entries = []
             
             try:
-                spinner = ['|', '/', '-', '\\']
-                for i in range(5):
-                    print(f"\b{spinner[i % 4]}", end='', flush=True)
-                    time.sleep(0.1)
+                with METRICS.timer("turn.identify_steps"):
+                    steps = identify_steps(question)
+                with METRICS.timer("turn.build_context"):
+                    context = conversation_memory.build_context(question)
+                futures = submit_steps(steps, model_name, context=context, deadline=deadline)
+                entries = [None] * len(steps)
+                if not steps:
+                    spinner.stop()
+                    print("\b" + colored("\nNothing to answer in that question.", 'yellow'))
 
-                steps = identify_steps(question)
-                
-                for i, (step_type, step_content) in enumerate(steps):
-                    if step_type == "translate":
-                        try:
-                            german_text = translate_to_german(step_content)
-                            print("\b" + colored("\nTranslator:", 'cyan'))
-                            print(f"'{step_content}' in German is: '{german_text}'")
-                            
-                            conversation_memory.append({
-                                "query": f"Translate '{step_content}' to German", 
-                                "response": f"'{step_content}' in German is: '{german_text}'",
-                                "source": "Translator"
-                            })
-                        except TranslationError as te:
-                            print("\b" + colored(f"\nTranslator Error: {te}", 'red'))
-                    
-                    elif step_type == "calculate":
-                        try:
-                            result = parse_and_calculate(step_content)
-                            print("\b" + colored("\nCalculator:", 'cyan'))
-                            print(f"The final answer is: {result}")
-                            
-                            conversation_memory.append({
-                                "query": step_content, 
-                                "response": f"The final answer is: {result}",
-                                "source": "Calculator"
-                            })
-                        except CalculatorError as ce:
-                            print("\b" + colored(f"\nCalculator Error: {ce}", 'red'))
-                    
-                    else:  # LLM
-                        try:
-                            llm_response = get_llm_response(step_content, model_name)
-                            print("\b" + colored("\nAssistant:", 'green'))
-                            print(llm_response)
-
-                            conversation_memory.append({
-                                "query": step_content, 
-                                "response": llm_response,
-                                "source": "Assistant"
-                            })
-                        except Exception as e:
-                            print("\b" + colored(f"\nAssistant Error: {e}", 'red'))
-                    
-                    if i < len(steps) - 1:
+                # Steps are shown as they finish, so local answers come first.
+                finished = as_finished(futures, deadline)
+                for n in range(len(steps)):
+                    with METRICS.timer("turn.wait"):
+                        i, future = next(finished)
+                    step_type, step_content = steps[i]
+                    tool = TOOLS.find(step_type)
+                    try:
+                        entry = step_result(future, deadline)
+                        if n == 0:
+                            METRICS.observe("turn.first_output", time.perf_counter() - turn_start)
+                        with METRICS.timer("turn.render"):
+                            spinner.stop()
+                            print("\b" + colored(f"\n{entry['source']}:", tool.color))
+                            print(entry["response"])
+                        entries[i] = entry
+                    except Exception as e:
+                        spinner.stop()
+                        METRICS.incr(f"step.{step_type}.errors")
+                        # Errors a tool reports inline; anything else aborts the turn.
+                        if not isinstance(e, (tool.errors, DeadlineExceeded)):
+                            raise
+                        print("\b" + colored(f"\n{tool.error_label}: {e}", 'red'))
+
+                    if n < len(steps) - 1:
                         print(colored("\n" + "-" * 40, 'yellow'))
-                    
+                METRICS.observe("turn.total", time.perf_counter() - turn_start)
+
+            except KeyboardInterrupt:
+                # Ctrl-C drops the turn; at the prompt it still quits.
+                spinner.stop()
+                METRICS.incr("turn.cancelled")
+                print("\b" + colored("\nTurn cancelled.", 'magenta'))
             except Exception as e:
+                spinner.stop()
                 print("\b" + colored(f"\nError: {e}", 'red'))
                 print("Please try again or check your connection.")
+            finally:
+                # Some turns print nothing (no steps planned); stop() is a no-op if already stopped.
+                spinner.stop()
+                drop_steps(futures, deadline)
+                # Shown as they finished, but remembered in step order.
+                for entry in entries:
+                    if entry is not None:
+                        conversation_memory.append(entry)
                 
         except KeyboardInterrupt:
             print(colored("\nGoodbye!", 'magenta'))
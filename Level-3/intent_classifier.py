@@ -0,0 +1,171 @@
+import re
+from functools import lru_cache
+
+MATH_KEYWORDS = ['add', 'plus', 'sum', 'total', 'subtract', 'minus',
+                 'difference', 'multiply', 'times', 'product', 'divide',
+                 'divided', 'quotient', '+', '-', '*', 'x', '/']
+TRANSLATION_KEYWORDS = ['translate', 'translation', 'how do you say', 'how to say', 'in german']
+GENERAL_KEYWORDS = ['translate', 'capital', 'explain', 'tell me', 'what is']
+CONJUNCTIONS = [' and ', ' then ', ' after that ', ',']
+
+# Spelled-out arithmetic with no operator keyword, e.g. "what is 2 and 3":
+# (lead words, regex that must follow one of them).
+MATH_PATTERNS = [(['what is', 'calculate', 'compute', 'find'],
+                  r'\s+\d+\s*(?:and|plus|minus|times|divided by)\s+\d+')]
+
+class Classification:
+    """Intents found in a text. Match spans are only worked out when asked for."""
+
+    __slots__ = ("_classifier", "_text", "_mask", "_spans")
+
+    def __init__(self, classifier, text, mask):
+        self._classifier = classifier
+        self._text = text
+        self._mask = mask
+        self._spans = None
+
+    def __contains__(self, intent):
+        return bool(self._mask & self._classifier.bits.get(intent, 0))
+
+    @property
+    def intents(self):
+        return {intent for intent, bit in self._classifier.bits.items() if self._mask & bit}
+
+    @property
+    def spans(self):
+        """Map each intent to the (start, end) spans that produced it."""
+        if self._spans is None:
+            self._spans = self._classifier.spans(self._text)
+        return self._spans
+
+    def count(self, intent):
+        return len(self.spans.get(intent, ())) if intent in self else 0
+
+    def __repr__(self):
+        return f"Classification({sorted(self.intents)!r})"
+
+def _trie_pattern(words):
+    """Regex alternation of words factored into a prefix trie.
+
+    The re module tries alternatives one by one, so sharing prefixes
+    ("divide"/"divided", "translate"/"translation") cuts the work per position.
+    """
+    root = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if "" in node:
+            return "(?:" + "|".join(branches) + ")?"
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    return build(root)
+
+class IntentClassifier:
+    """Match every intent's keywords in one pass of a single compiled regex.
+
+    The regex takes the longest keyword at each position and does not
+    revisit the characters it consumed. To keep the old "keyword in text"
+    semantics, a keyword that contains another one (e.g. "divided" holds
+    "divide", "explain" holds "x") also carries that keyword's intents.
+    A keyword can also start inside one the scan consumed: the "in" of
+    "in german" in "explain german". So for each matched keyword that ends
+    with the start of another keyword, that other keyword is looked for
+    in the text too. Patterns are only searched for when one of their lead
+    words was seen.
+    """
+
+    def __init__(self, keywords, patterns=None):
+        names = list(keywords) + [intent for intent in (patterns or {}) if intent not in keywords]
+        self.bits = {intent: 1 << i for i, intent in enumerate(names)}
+        masks = {}
+        for intent, words in keywords.items():
+            for word in words:
+                masks[word] = masks.get(word, 0) | self.bits[intent]
+        self._patterns = []
+        leads = set()
+        for intent, pats in (patterns or {}).items():
+            for lead_words, tail in pats:
+                leads.update(lead_words)
+                for word in lead_words:
+                    masks.setdefault(word, 0)
+                lead = "|".join(re.escape(word) for word in lead_words)
+                self._patterns.append((intent, re.compile(f"(?:{lead}){tail}")))
+        for word in masks:
+            for other in list(masks):
+                if word != other and other in word:
+                    masks[word] |= masks[other]
+                    if other in leads:
+                        leads.add(word)
+        # Keywords that may start inside each keyword and add to its intents.
+        self._overlaps = {}
+        for word in masks:
+            for other in masks:
+                if (masks[other] & ~masks[word] or other in leads) and any(
+                        word.endswith(other[:k]) for k in range(1, min(len(word), len(other)))):
+                    self._overlaps.setdefault(word, []).append(other)
+        self._masks = masks
+        self._leads = frozenset(leads)
+        self._regex = re.compile(_trie_pattern(masks))
+
+    def classify(self, text):
+        text = text.lower()
+        masks = self._masks
+        mask = 0
+        lead_seen = False
+        overlaps = self._overlaps
+        for word in self._regex.findall(text):
+            mask |= masks[word]
+            if word in self._leads:
+                lead_seen = True
+            if word in overlaps:
+                for other in overlaps[word]:
+                    if other in text:
+                        mask |= masks[other]
+                        if other in self._leads:
+                            lead_seen = True
+        if lead_seen:
+            for intent, pattern in self._patterns:
+                if pattern.search(text):
+                    mask |= self.bits[intent]
+        return Classification(self, text, mask)
+
+    def spans(self, text):
+        """Map each intent found in text to the (start, end) spans that produced it."""
+        text = text.lower()
+        spans = {}
+        for match in self._regex.finditer(text):
+            mask = self._masks[match.group()]
+            for intent, bit in self.bits.items():
+                if mask & bit:
+                    spans.setdefault(intent, []).append(match.span())
+        for intent, pattern in self._patterns:
+            for match in pattern.finditer(text):
+                spans.setdefault(intent, []).append(match.span())
+        for found in spans.values():
+            found.sort()
+        return spans
+
+CLASSIFIER = IntentClassifier(
+    {
+        "math": MATH_KEYWORDS,
+        "translate": TRANSLATION_KEYWORDS,
+        "general": GENERAL_KEYWORDS,
+        "conjunction": CONJUNCTIONS,
+        "question": ['?'],
+    },
+    {"math": MATH_PATTERNS},
+)
+
+@lru_cache(maxsize=1024)
+def classify(text: str) -> Classification:
+    """Classify text once; repeated checks on the same text are cache hits."""
+    return CLASSIFIER.classify(text)
@@ -0,0 +1,117 @@
+import re
+import threading
+from collections import deque
+
+def estimate_tokens(text):
+    """Rough token count: about four characters per token."""
+    return len(text) // 4 + 1
+
+# Words too common to say two questions are about the same thing.
+_STOPWORDS = {'what', 'tell', 'about', 'then', 'into', 'with', 'that', 'this', 'please', 'does', 'from'}
+
+# Words that point back at the previous step, as in "What is its population?".
+_FOLLOW_UP_WORDS = {'it', 'its', "it's", 'they', 'them', 'their', 'he', 'him', 'his', 'she', 'her',
+                    'that', 'this', 'those', 'these', 'there'}
+
+def _words(text):
+    return {word for word in re.findall(r"[a-z0-9']+", text.lower())
+            if len(word) > 3 and word not in _STOPWORDS}
+
+def _is_follow_up(text):
+    return not _FOLLOW_UP_WORDS.isdisjoint(re.findall(r"[a-z0-9']+", text.lower()))
+
+class MemoryRecord:
+    """One answered step, kept compact with __slots__."""
+
+    __slots__ = ("query", "response", "source", "tokens")
+
+    def __init__(self, query, response, source):
+        self.query = query
+        self.response = response
+        self.source = source
+        self.tokens = estimate_tokens(query) + estimate_tokens(response)
+
+    def as_dict(self):
+        return {"query": self.query, "response": self.response, "source": self.source}
+
+class ConversationMemory:
+    """Bounded ring buffer of recent steps with a running token estimate.
+
+    Once the buffer is full, the oldest record is folded into a short,
+    length-capped summary of earlier topics. Memory use therefore stays
+    constant no matter how long the session runs.
+    """
+
+    def __init__(self, max_records=50, context_tokens=800, summary_chars=600):
+        self.context_tokens = context_tokens
+        self.summary_chars = summary_chars
+        self.summary = ""
+        self.total_tokens = 0
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def append(self, entry):
+        """Store a {"query", "response", "source"} entry, as conversation_memory always has."""
+        record = MemoryRecord(entry["query"], entry["response"], entry["source"])
+        with self._lock:
+            if len(self._records) == self._records.maxlen:
+                self._fold(self._records[0])
+            self._records.append(record)
+            self.total_tokens += record.tokens
+
+    def _fold(self, record):
+        self.total_tokens -= record.tokens
+        topic = " ".join(record.query.split())[:80]
+        summary = f"{self.summary}; {topic}" if self.summary else topic
+        if len(summary) > self.summary_chars:
+            summary = summary[-self.summary_chars:].split("; ", 1)[-1]
+        self.summary = summary
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        with self._lock:
+            return iter([record.as_dict() for record in self._records])
+
+    def build_context(self, question, budget=None):
+        """Pack the recent steps related to the question into at most `budget` tokens.
+
+        Only steps sharing words with the question go in, newest first,
+        plus the last step when the question refers back to it ("its",
+        "they", ...). An earlier step asking the same question is left out,
+        so a repeated question gets the same context and hits the response
+        cache. The summary of earlier topics goes in if it shares words
+        with the question and fits. Returns "" when nothing is related.
+        """
+        budget = self.context_tokens if budget is None else budget
+        with self._lock:
+            records = list(self._records)
+            summary = self.summary
+        if not records and not summary:
+            return ""
+
+        question_words = _words(question)
+        normalized = " ".join(question.lower().split())
+        related = [i for i, record in enumerate(records)
+                   if question_words & _words(record.query)
+                   and " ".join(record.query.lower().split()) != normalized]
+        if records and _is_follow_up(question) and len(records) - 1 not in related:
+            related.append(len(records) - 1)
+        chosen = []
+        used = 0
+        for i in sorted(related, reverse=True):
+            if used + records[i].tokens > budget:
+                continue
+            chosen.append(i)
+            used += records[i].tokens
+
+        lines = []
+        if summary and question_words & _words(summary) and used + estimate_tokens(summary) <= budget:
+            lines.append(f"Earlier topics: {summary}")
+        for i in sorted(chosen):
+            lines.append(f"User: {records[i].query}")
+            lines.append(f"{records[i].source}: {records[i].response}")
+        if not lines:
+            return ""
+        return "Conversation so far:\n" + "\n".join(lines) + "\n\nCurrent question: "
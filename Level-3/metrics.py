@@ -0,0 +1,160 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+# Bucket upper bounds in seconds: 10us doubling up to about 84s.
+BUCKETS = [0.00001 * 2 ** i for i in range(24)]
+
+class Histogram:
+    """Fixed log-scale latency buckets; percentiles are bucket upper bounds, capped at the max."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        rank = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return 0.0
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1e3 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1e3,
+            "p99_ms": self.percentile(0.99) * 1e3,
+            "max_ms": self.max * 1e3,
+        }
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.metrics.incr(f"{self.name}.errors")
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+_NULL_TIMER = nullcontext()
+
+class Metrics:
+    """Counters and latency histograms keyed by name.
+
+    Disabled by default. Until enable() is called, timer() returns a
+    shared no-op context manager and incr()/observe() return at once,
+    so instrumented code pays one attribute check per call.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started = time.time()
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._dump_thread = None
+
+    def enable(self, dump_path=None, dump_interval=60.0):
+        self.enabled = True
+        if dump_path and self._dump_thread is None:
+            self._dump_thread = threading.Thread(target=self._dump_loop, args=(dump_path, dump_interval),
+                                                 daemon=True)
+            self._dump_thread.start()
+
+    def configure_from_env(self):
+        """Enable from METRICS=1, dumping to METRICS_FILE every METRICS_INTERVAL seconds."""
+        if os.getenv("METRICS", "").lower() in ("1", "true", "yes", "on"):
+            self.enable(os.getenv("METRICS_FILE") or None, float(os.getenv("METRICS_INTERVAL", "60")))
+
+    def incr(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def timer(self, name):
+        """Context manager recording the elapsed time of its block under name."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "uptime_s": time.time() - self.started,
+                "counters": dict(self._counters),
+                "latency": {name: histogram.summary() for name, histogram in self._histograms.items()},
+            }
+
+    def format(self):
+        snapshot = self.snapshot()
+        lines = []
+        for name, stats in sorted(snapshot["latency"].items()):
+            lines.append(f"{name:28} {stats['count']:6} calls  mean {stats['mean_ms']:8.2f} ms  "
+                         f"p50 {stats['p50_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  "
+                         f"max {stats['max_ms']:8.2f} ms")
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"{name:28} {value:6}")
+        return "\n".join(lines) or "No measurements yet."
+
+    def dump(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _dump_loop(self, path, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.dump(path)
+            except OSError:
+                pass
+
+METRICS = Metrics()
+
+def instrument(name):
+    """Decorator timing every call of the function under name."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            with _Timer(METRICS, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
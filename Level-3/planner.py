@@ -0,0 +1,70 @@
+import re
+from functools import lru_cache
+from calculator_tool import calculation_spans
+from intent_classifier import classify
+from tools import TOOLS
+from translator_tool import extract_text_to_translate
+
+# Where a question splits into independent parts.
+_PART_RE = re.compile(r',\s*|\s+and\s+then\s+|\s+then\s+')
+# Used when a part has no arithmetic run, e.g. "what is 2 and 3".
+_AND_SPLIT_RE = re.compile(r'(?<=\d)\s+and\s+(?=\d|add|subtract|multiply|divide)')
+
+def calculation_segments(text):
+    """Return the calculations in text, in order of appearance.
+
+    Each segment is a whole arithmetic run, so "what is 2 + 3 * 4" gives
+    one segment that evaluates to 14, not "2 + 3".
+    """
+    segments = calculation_spans(text)
+    if not segments:
+        segments = [segment.strip() for segment in _AND_SPLIT_RE.split(text) if "math" in classify(segment)]
+    if not segments and "math" in classify(text):
+        segments = [text]
+    return segments
+
+def translation_steps(text):
+    """Matcher for the translator: the text to translate, if text asks for a translation."""
+    if "translate" not in classify(text):
+        return None
+    found = extract_text_to_translate(text)
+    return [found] if found else []
+
+def calculation_steps(text):
+    """Matcher for the calculator: each calculation in text, if text is about math."""
+    if "math" not in classify(text):
+        return None
+    return calculation_segments(text)
+
+@lru_cache(maxsize=1024)
+def _plan(question, tools_version):
+    parts = _PART_RE.split(question)
+    steps = []
+    if len(parts) > 1:
+        for part in parts:
+            part = part.strip()
+            if not part:
+                continue
+            # Each part goes to the first tool that claims it.
+            claim = next(TOOLS.claims(part), None)
+            if claim is None:
+                steps.append((TOOLS.default.name, part))
+            else:
+                tool, contents = claim
+                steps.extend((tool.name, content) for content in contents)
+    else:
+        # A single question gets a step from every tool that claims it.
+        for tool, contents in TOOLS.claims(question):
+            steps.extend((tool.name, content) for content in contents)
+        if not steps:
+            steps.append((TOOLS.default.name, question))
+    return tuple(steps)
+
+def plan_steps(question: str) -> list[tuple[str, str]]:
+    """Turn a question into ordered (step type, content) pairs.
+
+    Step types are tool names from TOOLS, found by the tools' matchers, so
+    a newly registered tool gets steps without changes here. Plans are
+    cached on the whitespace-normalized question.
+    """
+    return list(_plan(" ".join(question.split()), TOOLS.version))
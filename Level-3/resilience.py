@@ -0,0 +1,302 @@
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# HTTP statuses worth another attempt: rate limited or a transient server fault.
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+def is_retryable(error):
+    """True for timeouts, connection failures and google.api_core errors with a transient status."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return getattr(error, "code", None) in RETRYABLE_CODES
+
+class DeadlineExceeded(Exception):
+    """The turn ran out of time or was cancelled; never retried."""
+
+class Deadline:
+    """Time budget shared by every step of one turn.
+
+    Steps check it before starting work and between retries, and cap their
+    own timeouts at remaining(). cancel() ends the budget at once, e.g.
+    on Ctrl-C. Threads cannot be interrupted, so a request already in
+    flight finishes in the background and its result is dropped.
+    """
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds if seconds else None
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def remaining(self):
+        """Seconds left: 0 once expired or cancelled, inf without a budget."""
+        if self._cancelled.is_set():
+            return 0.0
+        if self.expires is None:
+            return math.inf
+        return max(0.0, self.expires - time.monotonic())
+
+    def timeout(self):
+        """remaining() as a Future.result() timeout, where None means no limit."""
+        remaining = self.remaining()
+        return None if remaining == math.inf else remaining
+
+    def check(self):
+        if self.remaining() <= 0:
+            if self.cancelled:
+                raise DeadlineExceeded("Turn cancelled")
+            raise DeadlineExceeded(f"Turn deadline of {self.seconds:g}s exceeded")
+
+class TokenBucket:
+    """Client-side rate limiter: `rate` requests per second, bursts up to `burst`."""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def _take(self, deadline):
+        """Take a token and return 0, or return how long to wait for one."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            wait_for = (1 - self._tokens) / self.rate
+        if deadline is not None:
+            deadline.check()
+            wait_for = min(wait_for, deadline.remaining())
+        return wait_for
+
+    def acquire(self, deadline=None):
+        """Block until a token is available, or raise DeadlineExceeded once `deadline` runs out."""
+        while True:
+            wait_for = self._take(deadline)
+            if not wait_for:
+                return
+            self._sleep(wait_for)
+
+    async def acquire_async(self, deadline=None):
+        """acquire() for coroutines: waits without blocking the event loop."""
+        import asyncio
+        while True:
+            wait_for = self._take(deadline)
+            if not wait_for:
+                return
+            await asyncio.sleep(wait_for)
+
+class LatencyTracker:
+    """Sliding window of recent call latencies."""
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, fraction):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+class ResilientCaller:
+    """Wrap a blocking backend call with retries, rate limiting and hedging.
+
+    Retryable errors (see is_retryable) are retried with full-jitter
+    exponential backoff. Every attempt first takes a token from `limiter`.
+    With `hedge` on, and once `hedge_min_samples` latencies are known, a
+    duplicate request is fired if the first one is still running after
+    the `hedge_percentile` (p95) latency of earlier winning attempts.
+    Whichever answers first wins, and the slower call's result is
+    discarded. The backend is any callable, so a local fake can
+    stand in for Gemini. Pass `deadline` (a Deadline) to stop retrying, or
+    waiting for a token, once the turn is out of time; it is also handed
+    on to the backend.
+    """
+
+    def __init__(self, call, retries=3, base_delay=0.5, max_delay=8.0, limiter=None,
+                 hedge=False, hedge_percentile=0.95, hedge_min_samples=20, sleep=time.sleep, rng=None):
+        self.call = call
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limiter = limiter
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyTracker()
+        self.retried = 0
+        self.hedged = 0
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._executor = ThreadPoolExecutor(max_workers=32) if hedge else None
+
+    @classmethod
+    def from_env(cls, call):
+        """Build a caller from LLM_RPM, LLM_RETRIES and LLM_HEDGE."""
+        rpm = float(os.getenv("LLM_RPM", "60"))
+        return cls(
+            call,
+            retries=int(os.getenv("LLM_RETRIES", "3")),
+            limiter=TokenBucket(rpm / 60, burst=max(1, int(rpm // 10))) if rpm > 0 else None,
+            hedge=os.getenv("LLM_HEDGE", "").lower() in ("1", "true", "yes", "on"),
+        )
+
+    def backoff(self, attempt):
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def __call__(self, *args, deadline=None, **kwargs):
+        if deadline is not None:
+            kwargs["deadline"] = deadline
+        for attempt in range(self.retries + 1):
+            if deadline is not None:
+                deadline.check()
+            if self.limiter:
+                self.limiter.acquire(deadline)
+            try:
+                return self._attempt(args, kwargs)
+            except Exception as e:
+                self._sleep(self._retry_delay(attempt, e, deadline))
+
+    async def call_async(self, func, *args, deadline=None, **kwargs):
+        """Like calling the caller, for a coroutine function `func` instead of
+        `call`. It shares the limiter, latencies and counters; losing hedged
+        requests are cancelled, and so is the whole call if its task is."""
+        import asyncio
+        if deadline is not None:
+            kwargs["deadline"] = deadline
+        for attempt in range(self.retries + 1):
+            if deadline is not None:
+                deadline.check()
+            if self.limiter:
+                await self.limiter.acquire_async(deadline)
+            try:
+                return await self._attempt_async(func, args, kwargs)
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(attempt, e, deadline))
+
+    def _retry_delay(self, attempt, error, deadline):
+        """Return the backoff before retrying after error, or re-raise it."""
+        if attempt == self.retries or not is_retryable(error):
+            raise error
+        delay = self.backoff(attempt)
+        if deadline is not None and delay >= deadline.remaining():
+            raise error
+        self.retried += 1
+        return delay
+
+    def _timed(self, args, kwargs):
+        start = time.perf_counter()
+        result = self.call(*args, **kwargs)
+        return result, time.perf_counter() - start
+
+    def _attempt(self, args, kwargs):
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            result, elapsed = self._timed(args, kwargs)
+        else:
+            result, elapsed = self._hedged(args, kwargs)
+        # Only the winner's own latency is kept. A stalled request that lost
+        # to its hedge would push the percentile up until hedging stopped.
+        self.latency.record(elapsed)
+        return result
+
+    def _hedged(self, args, kwargs):
+        pending = {self._executor.submit(self._timed, args, kwargs)}
+        done, pending = wait(pending, timeout=self.latency.percentile(self.hedge_percentile))
+        hedges = 0
+        if not done and self._hedge_allowed():
+            hedges += 1
+            pending.add(self._executor.submit(self._timed, args, kwargs))
+        error = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+                # A hedge that failed fast, e.g. with a 429, is sent again while
+                # the stalled request it was covering is still running.
+                if pending and hedges and hedges <= self.retries and is_retryable(error) and self._hedge_allowed():
+                    hedges += 1
+                    pending.add(self._executor.submit(self._timed, args, kwargs))
+            if not pending:
+                raise error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    def _hedge_allowed(self):
+        if self.limiter is None or self.limiter.try_acquire():
+            self.hedged += 1
+            return True
+        return False
+
+    async def _attempt_async(self, func, args, kwargs):
+        async def timed():
+            start = time.perf_counter()
+            result = await func(*args, **kwargs)
+            return result, time.perf_counter() - start
+
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            result, elapsed = await timed()
+        else:
+            result, elapsed = await self._hedged_async(timed)
+        self.latency.record(elapsed)
+        return result
+
+    async def _hedged_async(self, timed):
+        import asyncio
+        pending = {asyncio.ensure_future(timed())}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.latency.percentile(self.hedge_percentile))
+            hedges = 0
+            if not done and self._hedge_allowed():
+                hedges += 1
+                pending.add(asyncio.ensure_future(timed()))
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                    if pending and hedges and hedges <= self.retries and is_retryable(error) and self._hedge_allowed():
+                        hedges += 1
+                        pending.add(asyncio.ensure_future(timed()))
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
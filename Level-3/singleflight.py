@@ -0,0 +1,129 @@
+import math
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+class _SharedDeadline:
+    """Deadline of a shared call: it runs out only once every caller
+    waiting on the call has run out of time (None means no limit)."""
+
+    def __init__(self, deadline):
+        self._deadlines = [deadline]
+
+    def add(self, deadline):
+        self._deadlines.append(deadline)
+
+    def remaining(self):
+        return max(math.inf if deadline is None else deadline.remaining() for deadline in self._deadlines)
+
+    def timeout(self):
+        remaining = self.remaining()
+        return None if remaining == math.inf else remaining
+
+    def check(self):
+        if self.remaining() <= 0:
+            # Every deadline has run out; report the leader's, as an
+            # uncontended call would.
+            self._deadlines[0].check()
+
+class SingleFlight:
+    """Coalesce identical in-flight calls so only one reaches the backend.
+
+    The first caller for a key runs the call on its own thread. Callers
+    arriving with the same key before it finishes wait and share its
+    result or exception. Nothing is kept once the call returns; caching
+    is the response cache's job. do() serves threads and do_async()
+    serves coroutines on one event loop. They keep separate tables,
+    because a thread must not block on a coroutine and a coroutine must
+    not block on a thread.
+
+    With `deadline`, the call gets a deadline that runs out only once
+    every waiting caller's has, so the leader running out of time does
+    not fail the others. Each other caller waits only until its own
+    deadline runs out. A do_async() call is cancelled once every caller
+    waiting on it has timed out or been cancelled.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, deadline=None, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                future = Future()
+                shared_deadline = None if deadline is None else _SharedDeadline(deadline)
+                self._calls[key] = future, shared_deadline
+            else:
+                future, shared_deadline = call
+                if shared_deadline is not None:
+                    shared_deadline.add(deadline)
+                self.shared += 1
+        if leader:
+            if shared_deadline is not None:
+                kwargs["deadline"] = shared_deadline
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                with self._lock:
+                    del self._calls[key]
+        if deadline is None:
+            return future.result()
+        while True:
+            try:
+                return future.result(timeout=deadline.timeout())
+            except FutureTimeout:
+                if future.done():  # the shared call itself timed out
+                    raise
+                deadline.check()
+
+    async def do_async(self, key, func, *args, deadline=None, **kwargs):
+        import asyncio  # only async callers pay for the import
+        call = self._tasks.get(key)
+        if call is None:
+            shared_deadline = None if deadline is None else _SharedDeadline(deadline)
+            if shared_deadline is not None:
+                kwargs["deadline"] = shared_deadline
+            call = self._tasks[key] = _AsyncCall(asyncio.ensure_future(func(*args, **kwargs)), shared_deadline)
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            if call.deadline is not None:
+                call.deadline.add(deadline)
+            self.shared += 1
+        call.waiters += 1
+        try:
+            # shield: one caller giving up must not cancel the call for the others.
+            return await asyncio.wait_for(asyncio.shield(call.task), None if deadline is None else deadline.timeout())
+        except asyncio.TimeoutError:
+            if call.task.done():  # the shared call itself timed out
+                raise
+            deadline.check()
+            raise
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                # Nobody wants the answer any more, so stop retrying for it.
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key, call):
+        if self._tasks.get(key) is call:
+            del self._tasks[key]
+
+class _AsyncCall:
+    __slots__ = ("task", "deadline", "waiters")
+
+    def __init__(self, task, deadline):
+        self.task = task
+        self.deadline = deadline
+        self.waiters = 0
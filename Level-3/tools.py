@@ -0,0 +1,118 @@
+import threading
+import time
+
+# Local tools whose learned cost stays below this run inline instead of on
+# the step pool, so their answers never queue behind network requests.
+INLINE_COST = 0.05
+
+class Tool:
+    """One kind of step: how to recognise it, run it and what it costs.
+
+    `matches(text)` is how the planner finds the tool's steps: None when
+    the text is not for this tool, else the list of step contents to run
+    (possibly empty). A tool without a matcher only gets steps as the
+    registry's default. `run(content, model_name, context, deadline)`
+    returns the step's conversation_memory entry. Tools that can answer
+    several steps with one request also give `run_many`, taking a list of
+    contents and returning one entry per step (None for a step it could
+    not answer), and `batch_if(count)`, which says whether batching is
+    worth it for that many steps. `cost` is a latency estimate in seconds.
+    It starts at the declared value and follows observed latencies as an
+    EWMA.
+    """
+
+    def __init__(self, name, source, run, errors=Exception, local=False, cost=1.0, color='green',
+                 matches=None, run_many=None, batch_if=None, alpha=0.2):
+        self.name = name
+        self.source = source
+        self.run = run
+        self.errors = errors
+        self.local = local
+        self.cost = cost
+        self.color = color
+        self.matches = matches
+        self.run_many = run_many
+        self.batch_if = batch_if or (lambda count: count > 1)
+        self.alpha = alpha
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def inline(self):
+        return self.local and self.cost < INLINE_COST
+
+    @property
+    def error_label(self):
+        return f"{self.source} Error"
+
+    def observe(self, seconds):
+        with self._lock:
+            self.calls += 1
+            self.cost += self.alpha * (seconds - self.cost)
+
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def call(self, step_content, model_name, context="", deadline=None):
+        if deadline is not None:
+            deadline.check()
+        return self._timed(self.run, step_content, model_name, context, deadline)
+
+    def call_many(self, step_contents, model_name, context="", deadline=None):
+        if deadline is not None:
+            deadline.check()
+        return self._timed(self.run_many, step_contents, model_name, context, deadline)
+
+    def __repr__(self):
+        return f"Tool({self.name!r}, local={self.local}, cost={self.cost:.4f})"
+
+class ToolRegistry:
+    """Tools in registration order, which is the order their matchers are tried in.
+
+    The default tool takes whatever no matcher claims. `version` changes
+    on every registration, so cached plans are not reused across it.
+    """
+
+    def __init__(self):
+        self._tools = {}
+        self.default = None
+        self.version = 0
+
+    def register(self, tool, default=False):
+        self._tools[tool.name] = tool
+        if default:
+            self.default = tool
+        self.version += 1
+        return tool
+
+    def find(self, step_type):
+        tool = self._tools.get(step_type)
+        if tool is None:
+            raise LookupError(f"No tool handles {step_type!r} steps")
+        return tool
+
+    def claims(self, text):
+        """Yield (tool, step contents) for each tool whose matcher claims text, in registration order."""
+        for tool in self._tools.values():
+            if tool.matches is not None:
+                contents = tool.matches(text)
+                if contents is not None:
+                    yield tool, contents
+
+    def costs(self):
+        """Learned cost in seconds and call count per tool."""
+        return {tool.name: {"cost": round(tool.cost, 6), "calls": tool.calls, "local": tool.local}
+                for tool in self._tools.values()}
+
+    def format(self):
+        return "\n".join(f"{tool.name:<10} {'local' if tool.local else 'remote':<7}"
+                         f"{tool.cost * 1e3:>9.1f} ms  {tool.calls} calls" for tool in self._tools.values())
+
+    def __iter__(self):
+        return iter(self._tools.values())
+
+TOOLS = ToolRegistry()
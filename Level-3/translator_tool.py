@@ -1,20 +1,107 @@
-from googletrans import Translator
+import threading
+import time
+from collections import OrderedDict
+from intent_classifier import classify
+from metrics import instrument
+from resilience import DeadlineExceeded
+from singleflight import SingleFlight
+
+MEMO_SIZE = 1024
 
 class TranslationError(Exception):
     pass
 
-def translate_to_german(text: str) -> str:
-    try:
-        translator = Translator()
-        result = translator.translate(text, src='en', dest='de')
-        return result.text
-    except Exception as e:
-        raise TranslationError(f"Translation error: {str(e)}")
+# Seconds one googletrans request may take; a turn's deadline caps it further.
+TIMEOUT = 10.0
+
+_memo = OrderedDict()
+_lock = threading.Lock()
+_local = threading.local()
+# Concurrent requests for the same texts share one googletrans call.
+_flight = SingleFlight()
+
+def _new_translator():
+    # googletrans pulls in httpx; only load it once a translation is needed.
+    from googletrans import Translator
+    from httpx import Timeout
+    return Translator(timeout=Timeout(TIMEOUT))
+
+def _get_translator():
+    """Return this thread's Translator so its HTTP session is reused across calls.
+
+    Threads do not share one, because each request's timeout is set on the
+    translator's HTTP client just before it is sent.
+    """
+    translator = getattr(_local, "translator", None)
+    if translator is None:
+        translator = _local.translator = _new_translator()
+    return translator
+
+def _translate(translator, text, deadline):
+    from httpx import Timeout  # already loaded by googletrans
+    while True:
+        timeout = TIMEOUT if deadline is None else min(TIMEOUT, deadline.remaining())
+        if timeout <= 0:
+            deadline.check()
+        translator.client.timeout = Timeout(timeout)
+        start = time.monotonic()
+        try:
+            return translator.translate(text, src='en', dest='de').text
+        except Exception:
+            if deadline is None or timeout == TIMEOUT:
+                raise
+            # Cut short by the deadline: report that, unless another turn
+            # sharing this request has extended it, then use the extra time.
+            deadline.check()
+            if time.monotonic() - start < timeout:
+                raise
+
+@instrument("translator.request")
+def _translate_batch(texts, deadline=None):
+    """Translate texts in one request by joining them with newlines."""
+    translator = _get_translator()
+    if len(texts) == 1 or any("\n" in text for text in texts):
+        return [_translate(translator, text, deadline) for text in texts]
+    lines = _translate(translator, "\n".join(texts), deadline).split("\n")
+    if len(lines) != len(texts):
+        return [_translate(translator, text, deadline) for text in texts]
+    return [line.strip() for line in lines]
+
+@instrument("translator")
+def translate_many(texts: list[str], deadline=None) -> list[str]:
+    """Translate texts to German, from the memo where possible.
+
+    With `deadline` (a resilience.Deadline), no request outlives the time
+    left and DeadlineExceeded is raised once it runs out.
+    """
+    results = {}
+    with _lock:
+        for text in texts:
+            if text in _memo:
+                _memo.move_to_end(text)
+                results[text] = _memo[text]
+    pending = list(dict.fromkeys(text for text in texts if text not in results))
+    if pending:
+        try:
+            translated = _flight.do(tuple(pending), _translate_batch, pending, deadline=deadline)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise TranslationError(f"Translation error: {str(e)}")
+        with _lock:
+            for text, german_text in zip(pending, translated):
+                results[text] = german_text
+                _memo[text] = german_text
+                _memo.move_to_end(text)
+            while len(_memo) > MEMO_SIZE:
+                _memo.popitem(last=False)
+    return [results[text] for text in texts]
+
+def translate_to_german(text: str, deadline=None) -> str:
+    return translate_many([text], deadline)[0]
 
 def is_translation_request(question: str) -> bool:
-    q = question.lower()
-    translation_keywords = ['translate', 'translation', 'how do you say', 'how to say', 'in german']
-    return any(keyword in q for keyword in translation_keywords)
+    return "translate" in classify(question)
 
 def extract_text_to_translate(question: str) -> str:
     import re
@@ -0,0 +1,61 @@
+"""Measure AnswerIndex lookup latency as the number of stored answers grows.
+
+Run from the repository root:
+
+    python benchmarks/bench_answer_index.py
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "Level-3"))
+
+from answer_index import AnswerIndex
+
+def random_question(rng, words):
+    return f"{rng.choice(['what is', 'who was', 'explain', 'tell me about'])} " + " ".join(
+        rng.choice(words) for _ in range(rng.randint(2, 6)))
+
+# (stored question, stored answer, new question, expected answer or None).
+# Questions that differ only in word order ask different things.
+CORRECTNESS = [
+    ("What is the capital of Italy?", "Rome", "what is the capital of italy", "Rome"),
+    ("Who wrote Hamlet?", "Shakespeare", "Who wrote Hamlet", "Shakespeare"),
+    ("What is the capital of Niger?", "Niamey", "What is the capital of Nigeria?", None),
+    ("Convert 10 miles to km", "10 miles is 16.09 km", "Convert 10 km to miles", None),
+    ("Is Python faster than Java?", "Usually not.", "Is Java faster than Python?", None),
+    ("Did France beat Germany in 2014?", "No", "Did Germany beat France in 2014?", None),
+]
+
+def check_correctness():
+    for stored, answer, question, expected in CORRECTNESS:
+        index = AnswerIndex()
+        index.add(stored, answer)
+        match = index.lookup(question)
+        assert (match and match[0]) == expected, (question, match)
+    print(f"correctness: {len(CORRECTNESS)} cases ok")
+
+def main(sizes=(1_000, 10_000, 100_000), lookups=1_000):
+    check_correctness()
+    rng = random.Random(0)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+             for _ in range(5_000)]
+    index = AnswerIndex(max_entries=max(sizes))
+    for size in sizes:
+        while len(index) < size:
+            index.add(random_question(rng, words), "answer")
+        queries = [random_question(rng, words) for _ in range(lookups)]
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.lookup(query)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1e3
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e3
+        print(f"{size:>7} entries: p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+if __name__ == "__main__":
+    main()
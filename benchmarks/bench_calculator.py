@@ -0,0 +1,151 @@
+"""Compare the compiled expression parser with the regex cascade it replaced.
+
+Run from the repository root:
+
+    python benchmarks/bench_calculator.py
+"""
+import math
+import os
+import random
+import re
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "Level-3"))
+
+from calculator_tool import CalculatorError, calculate_batch, compile_expression, parse_and_calculate
+
+# Phrasings the old parser handled, taken from the Interactions logs.
+EXPRESSIONS = [
+    "Add 2 and 2",
+    "multiply 3 and 3",
+    "multiply 12 and 12",
+    "Add 10 and 20",
+    "multiply 5 and 6",
+    "subtract 3 from 10",
+    "What is 5 plus 3?",
+    "10 divided by 2",
+    "12 + 3",
+    "5 x 6",
+]
+
+# Stray words, chained operands and precedence the parser must handle.
+FREE_TEXT = {
+    "I have 3 apples, add 2 and 5": 7.0,
+    "multiply 3 by 4 by 5": 60.0,
+    "what is 2 + 3 * 4": 14.0,
+    "(2+3)*4": 20.0,
+    "calculate 10 - 2 - 3": 5.0,
+    "Add 2 and 2 and multiply 3 and 3.": 4.0,
+}
+
+def legacy_parse_and_calculate(question):
+    q = question.lower().strip()
+    patterns = [
+        (r'(?:what is|calculate|compute|find)?\s*([\d.]+)\s*(plus|add|\+|minus|subtract|\-|times|multiply|\*|x|divided by|divide|/)\s*([\d.]+)', None),
+        (r'add\s*([\d.]+)\s*(and|to)\s*([\d.]+)', 'add'),
+        (r'subtract\s*([\d.]+)\s*from\s*([\d.]+)', 'subtract_reverse'),
+        (r'multiply\s*([\d.]+)\s*(and|by)\s*([\d.]+)', 'multiply'),
+        (r'divide\s*([\d.]+)\s*by\s*([\d.]+)', 'divide'),
+    ]
+    for pat, forced_op in patterns:
+        m = re.search(pat, q)
+        if m:
+            if forced_op:
+                if forced_op == 'add':
+                    return float(m.group(1)) + float(m.group(3))
+                elif forced_op == 'subtract_reverse':
+                    return float(m.group(2)) - float(m.group(1))
+                elif forced_op == 'multiply':
+                    return float(m.group(1)) * float(m.group(3))
+                elif forced_op == 'divide':
+                    return float(m.group(1)) / float(m.group(3))
+            else:
+                a = float(m.group(1))
+                op = m.group(2)
+                b = float(m.group(3))
+                if op in ['plus', 'add', '+']:
+                    return a + b
+                elif op in ['minus', 'subtract', '-']:
+                    return a - b
+                elif op in ['times', 'multiply', '*', 'x']:
+                    return a * b
+                elif op in ['divided by', 'divide', '/']:
+                    return a / b
+    m = re.match(r'([\d.]+)\s*([+\-*/x])\s*([\d.]+)', q)
+    if m:
+        a, op, b = float(m.group(1)), m.group(2), float(m.group(3))
+        if op == '+': return a + b
+        if op == '-': return a - b
+        if op in ['*', 'x']: return a * b
+        if op == '/': return a / b
+    raise ValueError(question)
+
+def bench(func, setup=None, number=2000):
+    def run():
+        if setup:
+            setup()
+        for expression in EXPRESSIONS:
+            func(expression)
+    elapsed = min(timeit.repeat(run, number=number, repeat=5))
+    return elapsed / (number * len(EXPRESSIONS)) * 1e6
+
+def batch_corpus(size, operand_max, seed=0):
+    rng = random.Random(seed)
+    operators = ['+', '-', '*', '/', 'plus', 'minus', 'times', 'divided by']
+    questions = []
+    for i in range(size):
+        a, b = rng.randint(0, operand_max), rng.randint(0, operand_max)
+        if i % 2:
+            questions.append(f"{a} {rng.choice(operators)} {b}")
+        else:
+            questions.append(f"{rng.choice(['add', 'multiply', 'divide'])} {a} and {b}")
+    return questions
+
+def bench_batch(questions):
+    """Return (scalar, batch) questions/s, checking that both paths agree."""
+    compile_expression.cache_clear()
+    start = time.perf_counter()
+    scalar = []
+    for question in questions:
+        try:
+            scalar.append(parse_and_calculate(question))
+        except CalculatorError:
+            scalar.append(None)
+    scalar_time = time.perf_counter() - start
+
+    compile_expression.cache_clear()
+    start = time.perf_counter()
+    values, errors = calculate_batch(questions)
+    batch_time = time.perf_counter() - start
+    for expected, value, error in zip(scalar, values, errors):
+        assert error == (expected is None) and (error or value == expected)
+    return len(questions) / scalar_time, len(questions) / batch_time
+
+def main():
+    for expression in EXPRESSIONS:
+        assert parse_and_calculate(expression) == legacy_parse_and_calculate(expression), expression
+    for question, expected in FREE_TEXT.items():
+        assert parse_and_calculate(question) == expected, question
+    long_expression = " + ".join(f"{i} * {i + 1}" for i in range(200))
+    assert parse_and_calculate(long_expression) == sum(i * (i + 1) for i in range(200))
+
+    values, errors = calculate_batch(["2 + 2", "1 / 0", "hello", None, "add 2 and 3"])
+    assert values[0] == 4.0 and values[4] == 5.0 and all(math.isnan(value) for value in values[1:4])
+    assert errors == [False, True, True, True, False]
+
+    legacy = bench(legacy_parse_and_calculate)
+    cold = bench(parse_and_calculate, setup=compile_expression.cache_clear)
+    warm = bench(parse_and_calculate)
+    print(f"legacy regex cascade : {legacy:6.2f} us/expression")
+    print(f"compiled, cold cache : {cold:6.2f} us/expression ({legacy / cold:.1f}x)")
+    print(f"compiled, warm cache : {warm:6.2f} us/expression ({legacy / warm:.1f}x)")
+
+    # 100k rows: all distinct, then a spreadsheet-like column where rows repeat.
+    for label, operand_max in (("distinct rows", 9999), ("repeated rows", 30)):
+        scalar, batch = bench_batch(batch_corpus(100_000, operand_max))
+        print(f"batch, {label:13}: {batch:10,.0f} questions/s vs {scalar:10,.0f} scalar ({batch / scalar:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Replay questions through the Level-3 routing and parsing hot path.
+
+Questions come from the Level-*/Interaction*.txt logs plus a generated
+corpus. Each function reports ops/s and p50/p99 latency. Save a baseline
+and compare later runs against it to catch regressions:
+
+    python benchmarks/bench_hotpath.py --save baseline.json
+    python benchmarks/bench_hotpath.py --compare baseline.json
+
+--compare exits with status 1 when a function is more than --tolerance
+(default 50%) slower than the baseline. Raw p50s of back-to-back runs
+differ by 20-70% on a shared machine, so the gate uses a steadier
+figure. Each round is paired with a fixed reference workload timed just
+before it, and the gate compares the median over rounds of p50 divided
+by that reference. That still moves by up to 40% between runs here,
+hence the default; lower it on a quiet machine.
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "Level-3"))
+
+from calculator_tool import CalculatorError, compile_expression, is_math_question, is_multi_step, parse_and_calculate
+from intent_classifier import classify
+from translator_tool import extract_text_to_translate, is_translation_request
+from full_agent import extract_calculation_segments, identify_steps
+
+def logged_questions():
+    questions = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "Level-*", "Interaction*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("You:"):
+                    question = line[4:].strip().lstrip("^")
+                    if question:
+                        questions.append(question)
+    return questions
+
+def generated_questions(size, seed=0):
+    rng = random.Random(seed)
+    words = ["Hello", "Good night", "Thank you", "Where is the station", "I like coffee"]
+    topics = ["the capital of Spain", "photosynthesis", "the tallest mountain", "black holes", "Python"]
+
+    def math():
+        a, b = rng.randint(1, 999), rng.randint(1, 999)
+        return rng.choice([f"add {a} and {b}", f"multiply {a} and {b}", f"subtract {a} from {b}",
+                           f"what is {a} plus {b}", f"{a} / {b}", f"divide {a} by {b}"])
+
+    def translate():
+        return rng.choice([f"translate '{rng.choice(words)}' into German",
+                           f"how do you say '{rng.choice(words)}' in German"])
+
+    def general():
+        return rng.choice([f"tell me about {rng.choice(topics)}", f"explain {rng.choice(topics)}",
+                           f"What is {rng.choice(topics)}?"])
+
+    makers = [math, translate, general]
+    questions = []
+    for _ in range(size):
+        parts = [rng.choice(makers)() for _ in range(rng.randint(1, 3))]
+        questions.append(rng.choice([", ", " then ", " and then "]).join(parts).capitalize())
+    return questions
+
+def calculation_inputs(questions):
+    segments = [content for question in questions
+                for kind, content in identify_steps(question) if kind == "calculate"]
+    valid = []
+    for segment in segments:
+        try:
+            parse_and_calculate(segment)
+            valid.append(segment)
+        except CalculatorError:
+            pass
+    return valid
+
+def reference_workload():
+    # Fixed pure-Python work whose speed depends only on the machine and
+    # the interpreter, not on this repository's code.
+    counts = {}
+    for i in range(500):
+        word = f"word{i % 97}"
+        counts[word] = counts.get(word, 0) + len(word.upper()) * (i % 7)
+    return counts
+
+def reference_ns(repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        reference_workload()
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def measure(func, inputs, rounds, cold):
+    latencies = []
+    relative = []
+    for _ in range(rounds):
+        if cold:
+            classify.cache_clear()
+            compile_expression.cache_clear()
+        reference = reference_ns()
+        round_latencies = []
+        for item in inputs:
+            start = time.perf_counter_ns()
+            func(item)
+            round_latencies.append(time.perf_counter_ns() - start)
+        latencies.extend(round_latencies)
+        round_latencies.sort()
+        relative.append(round_latencies[len(round_latencies) // 2] / reference)
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        "ops_per_sec": len(latencies) / (total / 1e9) if total else 0.0,
+        "p50_us": latencies[len(latencies) // 2] / 1e3,
+        # Median over rounds of each round's p50 in units of its reference time.
+        "relative_p50": statistics.median(relative),
+        "p99_us": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1e3,
+        "calls": len(latencies),
+    }
+
+def run(corpus_size, rounds, cold):
+    questions = logged_questions() + generated_questions(corpus_size)
+    suites = [
+        ("is_math_question", is_math_question, questions),
+        ("is_multi_step", is_multi_step, questions),
+        ("identify_steps", identify_steps, questions),
+        ("extract_calculation_segments", extract_calculation_segments,
+         [q for q in questions if is_math_question(q)]),
+        ("extract_text_to_translate", extract_text_to_translate,
+         [q for q in questions if is_translation_request(q)]),
+        ("parse_and_calculate", parse_and_calculate, calculation_inputs(questions)),
+    ]
+    return {name: measure(func, inputs, rounds, cold) for name, func, inputs in suites}
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if "relative_p50" in before:
+            change = stats["relative_p50"] / before["relative_p50"] - 1
+        else:  # a baseline saved before relative_p50 existed
+            change = stats["p50_us"] / before["p50_us"] - 1 if before["p50_us"] else 0.0
+        flag = "REGRESSION" if change > tolerance else ""
+        print(f"{name:30} p50 {before['p50_us']:8.2f} -> {stats['p50_us']:8.2f} us"
+              f"  relative to reference {change:+.0%} {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=int, default=2000, help="generated questions to add to the logged ones")
+    parser.add_argument("--rounds", type=int, default=20, help="passes over the corpus per function")
+    parser.add_argument("--cold", action="store_true", help="clear the memoization caches before every pass")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown of the reference-relative p50 before failing")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args.corpus, args.rounds, args.cold)
+    for name, stats in results.items():
+        print(f"{name:30} {stats['ops_per_sec']:12.0f} ops/s  p50 {stats['p50_us']:8.2f} us"
+              f"  p99 {stats['p99_us']:8.2f} us")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print()
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
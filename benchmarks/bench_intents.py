@@ -0,0 +1,113 @@
+"""Compare the single-pass intent classifier with the keyword scans it replaced.
+
+Run from the repository root:
+
+    python benchmarks/bench_intents.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "Level-3"))
+
+from intent_classifier import CLASSIFIER
+from calculator_tool import is_math_question, is_multi_step
+from translator_tool import is_translation_request
+
+QUESTIONS = [
+    "Add 2 and 2 and multiply 3 and 3.",
+    "Translate 'Sunshine' into German.",
+    "Tell me the capital of Italy, then multiply 12 and 12.",
+    "Add 10 and 20, then translate 'Have a nice day' into German.",
+    "Translate 'Good Morning' into German and then multiply 5 and 6.",
+    "What is the capital of France?",
+    "Explain photosynthesis in simple terms",
+    "what is 7 and 8",
+    "How do you say thank you in German? And what is 3 times 4?",
+    "Who wrote Hamlet?",
+    # Keywords that overlap: the "in" of "in german" ends "explain".
+    "Explain German grammar",
+]
+
+def legacy_is_math_question(question):
+    math_keywords = ['add', 'plus', 'sum', 'total', 'subtract', 'minus',
+                   'difference', 'multiply', 'times', 'product', 'divide',
+                   'divided', 'quotient', '+', '-', '*', 'x', '/']
+    question = question.lower()
+    if any(word in question for word in math_keywords):
+        return True
+    if re.search(r'\d+\s*[+\-*/x]\s*\d+', question):
+        return True
+    if re.search(r'(?:what is|calculate|compute|find)\s+\d+\s*(?:and|plus|minus|times|divided by)\s+\d+', question):
+        return True
+    return False
+
+def legacy_is_multi_step(question):
+    q = question.lower()
+    if q.count('?') > 1:
+        return True
+    conjunctions = [' and ', ' then ', ' after that ', ',']
+    if any(conj in q for conj in conjunctions):
+        return True
+    if legacy_is_math_question(q):
+        non_math_keywords = ['translate', 'capital', 'explain', 'tell me', 'what is']
+        if any(kw in q for kw in non_math_keywords):
+            return True
+    return False
+
+def legacy_is_translation_request(question):
+    q = question.lower()
+    translation_keywords = ['translate', 'translation', 'how do you say', 'how to say', 'in german']
+    return any(keyword in q for keyword in translation_keywords)
+
+def split_parts(question):
+    return [part.strip() for part in re.split(r',\s*|\s+and\s+then\s+|\s+then\s+', question) if part.strip()]
+
+def legacy_turn(question):
+    """The keyword checks one turn used to make: the question, then every part."""
+    results = [legacy_is_multi_step(question), legacy_is_math_question(question),
+               legacy_is_translation_request(question)]
+    for part in split_parts(question):
+        results.append((legacy_is_translation_request(part), legacy_is_math_question(part)))
+    return results
+
+def single_pass_turn(question):
+    """The same answers with one classifier pass over the question and each part."""
+    intents = CLASSIFIER.classify(question)
+    multi = ("conjunction" in intents or intents.count("question") > 1
+             or ("math" in intents and "general" in intents))
+    results = [multi, "math" in intents, "translate" in intents]
+    for part in split_parts(question):
+        part_intents = CLASSIFIER.classify(part)
+        results.append(("translate" in part_intents, "math" in part_intents))
+    return results
+
+def tool_turn(question):
+    """The tool functions as the agent calls them, memoized per text."""
+    results = [is_multi_step(question), is_math_question(question), is_translation_request(question)]
+    for part in split_parts(question):
+        results.append((is_translation_request(part), is_math_question(part)))
+    return results
+
+def check_equivalence():
+    for question in QUESTIONS:
+        expected = legacy_turn(question)
+        assert single_pass_turn(question) == expected, question
+        assert tool_turn(question) == expected, question
+
+def bench(func, number=2000):
+    elapsed = min(timeit.repeat(lambda: [func(q) for q in QUESTIONS], number=number, repeat=5))
+    return elapsed / (number * len(QUESTIONS)) * 1e6
+
+def main():
+    check_equivalence()
+    legacy = bench(legacy_turn)
+    single = bench(single_pass_turn)
+    memoized = bench(tool_turn)
+    print(f"legacy keyword scans : {legacy:7.2f} us/turn")
+    print(f"single-pass classifier: {single:6.2f} us/turn ({legacy / single:.1f}x)")
+    print(f"memoized tool calls  : {memoized:7.2f} us/turn ({legacy / memoized:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Compare the single-pass step planner with the identify_steps it replaced.
+
+Run from the repository root:
+
+    python benchmarks/bench_planner.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "Level-3"))
+
+import full_agent  # registers the tools whose matchers the planner uses
+from bench_hotpath import generated_questions, logged_questions
+from calculator_tool import CalculatorError, is_math_question, parse_and_calculate
+from planner import _plan, plan_steps
+from translator_tool import extract_text_to_translate, is_translation_request
+
+def legacy_extract_calculation_segments(query):
+    segments = []
+    patterns = [
+        r'(?:add|sum|plus)\s+([\d.]+)\s+(?:and|to|with)\s+([\d.]+)',
+        r'([\d.]+)\s*\+\s*([\d.]+)',
+        r'(?:subtract|minus)\s+([\d.]+)\s+(?:from)\s+([\d.]+)',
+        r'(?:subtract|minus)\s+([\d.]+)\s+(?:and|to|with)\s+([\d.]+)',
+        r'([\d.]+)\s*\-\s*([\d.]+)',
+        r'(?:multiply|times)\s+([\d.]+)\s+(?:and|by|with)\s+([\d.]+)',
+        r'([\d.]+)\s*(?:\*|x|×)\s*([\d.]+)',
+        r'(?:divide)\s+([\d.]+)\s+(?:by|with)\s+([\d.]+)',
+        r'([\d.]+)\s*\/\s*([\d.]+)'
+    ]
+    all_matches = []
+    for pattern in patterns:
+        for match in re.finditer(pattern, query, re.IGNORECASE):
+            all_matches.append((match.start(), match.group(0)))
+    all_matches.sort(key=lambda x: x[0])
+    for _, match_text in all_matches:
+        segments.append(match_text)
+    if not segments:
+        potential_segments = re.split(r'(?<=\d)\s+and\s+(?=\d|add|subtract|multiply|divide)', query)
+        segments = [seg.strip() for seg in potential_segments if is_math_question(seg)]
+    if not segments and is_math_question(query):
+        segments = [query]
+    return segments
+
+def legacy_identify_steps(question):
+    steps = []
+    explicit_parts = re.split(r',\s*|\s+and\s+then\s+|\s+then\s+', question)
+    if len(explicit_parts) > 1:
+        for part in explicit_parts:
+            part = part.strip()
+            if not part:
+                continue
+            if is_translation_request(part):
+                text_to_translate = extract_text_to_translate(part)
+                if text_to_translate:
+                    steps.append(("translate", text_to_translate))
+            elif is_math_question(part):
+                for segment in legacy_extract_calculation_segments(part):
+                    steps.append(("calculate", segment))
+            else:
+                steps.append(("llm", part))
+    else:
+        if is_translation_request(question):
+            text_to_translate = extract_text_to_translate(question)
+            if text_to_translate:
+                steps.append(("translate", text_to_translate))
+        if is_math_question(question):
+            for segment in legacy_extract_calculation_segments(question):
+                steps.append(("calculate", segment))
+        if not steps:
+            steps.append(("llm", question))
+    return steps
+
+# Chained or overlapping calculations. The old scan split them into
+# two-operand fragments; the planner keeps each whole run as one segment.
+OVERLAPPING = ["add 2 and 3 + 4", "multiply 6 and 7 x 2", "what is 2 + 3 * 4", "calculate 10 - 2 - 3"]
+
+def evaluated(steps):
+    """Steps with each calculation replaced by its value, so equivalent segments compare equal."""
+    result = []
+    for step_type, content in steps:
+        if step_type == "calculate":
+            try:
+                content = parse_and_calculate(content)
+            except CalculatorError:
+                content = None
+        result.append((step_type, content))
+    return result
+
+def bench(func, questions, setup=None, number=20):
+    def run():
+        if setup:
+            setup()
+        for question in questions:
+            func(question)
+    elapsed = min(timeit.repeat(run, number=number, repeat=5))
+    return elapsed / (number * len(questions)) * 1e6
+
+def main():
+    questions = [" ".join(q.split()) for q in logged_questions() + generated_questions(500)]
+    for question in questions:
+        assert evaluated(plan_steps(question)) == evaluated(legacy_identify_steps(question)), question
+    for question in OVERLAPPING:
+        print(f"{question!r}: legacy {legacy_identify_steps(question)} -> planner {plan_steps(question)}")
+
+    legacy = bench(legacy_identify_steps, questions)
+    cold = bench(plan_steps, questions, setup=_plan.cache_clear)
+    warm = bench(plan_steps, questions)
+    print(f"legacy identify_steps : {legacy:6.2f} us/question")
+    print(f"planner, cold cache   : {cold:6.2f} us/question ({legacy / cold:.1f}x)")
+    print(f"planner, warm cache   : {warm:6.2f} us/question ({legacy / warm:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Count backend calls for a burst of identical requests, with and without coalescing.
+
+Run from the repository root:
+
+    python benchmarks/bench_singleflight.py
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "Level-3"))
+
+from singleflight import SingleFlight
+
+QUESTIONS = ["What is the capital of Italy?", "Who wrote Hamlet?", "Explain photosynthesis"]
+
+class FakeBackend:
+    def __init__(self, latency=0.2):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return f"answer to {prompt}"
+
+    async def call_async(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return f"answer to {prompt}"
+
+def threaded(burst, coalesce):
+    backend = FakeBackend()
+    flight = SingleFlight()
+    ask = (lambda q: flight.do(q, backend, q)) if coalesce else backend
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=burst) as pool:
+        answers = list(pool.map(ask, (QUESTIONS[i % len(QUESTIONS)] for i in range(burst))))
+    assert all(answer == f"answer to {QUESTIONS[i % len(QUESTIONS)]}" for i, answer in enumerate(answers))
+    return backend.calls, time.perf_counter() - start
+
+async def asynchronous(burst, coalesce):
+    backend = FakeBackend()
+    flight = SingleFlight()
+
+    async def ask(question):
+        if coalesce:
+            return await flight.do_async(question, backend.call_async, question)
+        return await backend.call_async(question)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(ask(QUESTIONS[i % len(QUESTIONS)]) for i in range(burst)))
+    return backend.calls, time.perf_counter() - start
+
+def main(burst=200):
+    for name, run in (("threads", lambda c: threaded(burst, c)),
+                      ("asyncio", lambda c: asyncio.run(asynchronous(burst, c)))):
+        for coalesce in (False, True):
+            calls, elapsed = run(coalesce)
+            label = "coalesced" if coalesce else "direct"
+            print(f"{name:8} {label:10} {burst} requests -> {calls:4} backend calls in {elapsed:.2f} s")
+
+if __name__ == "__main__":
+    main()
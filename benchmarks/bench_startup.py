@@ -0,0 +1,57 @@
+"""Measure import time and time-to-prompt for each agent entry point.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py
+
+Import time is the cumulative figure `python -X importtime` reports for
+the entry module. Time to prompt runs the script with a dummy API key and
+waits until "You:" is printed. The goal is well under a second.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+ENTRY_POINTS = [
+    ("Level-1", "chatbot"),
+    ("Level-2", "chatbot_with_tool"),
+    ("Level-3", "full_agent"),
+]
+
+def import_time(level, module):
+    """Cumulative import time of module in seconds, from -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=os.path.join(ROOT, level), capture_output=True, text=True, check=True)
+    for line in reversed(result.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1e6
+    raise RuntimeError(f"no importtime line for {module}")
+
+def time_to_prompt(level, module):
+    env = {**os.environ, "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "dummy-key")}
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-u", f"{module}.py"], cwd=os.path.join(ROOT, level),
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env)
+    output = b""
+    while b"You:" not in output:
+        chunk = process.stdout.read1(4096)
+        if not chunk:
+            raise RuntimeError(f"{module} exited before showing the prompt: {output.decode(errors='replace')}")
+        output += chunk
+    elapsed = time.perf_counter() - start
+    process.communicate(b"q\n", timeout=30)
+    return elapsed
+
+def main(runs=5):
+    for level, module in ENTRY_POINTS:
+        imports = statistics.median(import_time(level, module) for _ in range(runs))
+        prompt = statistics.median(time_to_prompt(level, module) for _ in range(runs))
+        print(f"{level}/{module + '.py':22} import {imports * 1e3:7.1f} ms   prompt after {prompt * 1e3:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""In-process stand-ins for the Gemini SDK and googletrans.
+
+install() puts them in the slots the Level-3 agent loads lazily, so the
+agent, batch mode and server run unchanged but fully offline:
+
+    import full_agent, translator_tool
+    from fake_backends import FakeBackend, install
+    install(full_agent, translator_tool, FakeBackend(latency="lognormal:0.8,0.4", error_rate=0.02))
+
+Latency specs: "const:S", "uniform:LOW,HIGH", "lognormal:MEDIAN,SIGMA" and
+"exp:MEAN", all in seconds. Canned answers map a lowercase substring of
+the question to the text returned for it.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+def parse_latency(spec):
+    """Return a function drawing one latency in seconds from a spec string."""
+    kind, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(",")] if args else []
+    if kind == "const":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1 / values[0])
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+class FakeAPIError(Exception):
+    """Shaped like google.api_core errors: `code` is the HTTP status."""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+class FakeBackend:
+    """Latency, error rate and canned answers shared by a fake service's calls."""
+
+    def __init__(self, latency="const:0.05", error_rate=0.0, canned=None, seed=None,
+                 error_codes=(429, 503)):
+        self.sample_latency = parse_latency(latency) if isinstance(latency, str) else latency
+        self.error_rate = error_rate
+        self.error_codes = error_codes
+        self.canned = {key.lower(): value for key, value in (canned or {}).items()}
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Build a backend whose canned answers come from a JSON object file."""
+        with open(path, encoding="utf-8") as f:
+            return cls(canned=json.load(f), **kwargs)
+
+    def draw(self):
+        """Count a call and return (latency, error or None) for it."""
+        with self._lock:
+            self.calls += 1
+            latency = max(0.0, self.sample_latency(self._rng))
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+                code = self._rng.choice(self.error_codes)
+        return latency, FakeAPIError(code, "injected failure") if failed else None
+
+    def answer(self, question, default):
+        lowered = question.lower()
+        for key, value in self.canned.items():
+            if key in lowered:
+                return value
+        return default
+
+class FakeResponse:
+    def __init__(self, text, prompt_tokens):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens, cached_content_token_count=0,
+            candidates_token_count=len(text) // 4 + 1, total_token_count=prompt_tokens + len(text) // 4 + 1)
+
+    def __iter__(self):
+        for start in range(0, len(self.text), 40):
+            chunk = FakeResponse.__new__(FakeResponse)
+            chunk.text = self.text[start:start + 40]
+            yield chunk
+
+# The numbered questions of a fused request (see full_agent.FUSED_PROMPT).
+_NUMBERED_RE = re.compile(r"^\d+\. (.+)$", re.MULTILINE)
+
+class FakeGenerativeModel:
+    """Stands in for genai.GenerativeModel; answers come from the backend."""
+
+    def __init__(self, model_name, backend, system_instruction=None, **kwargs):
+        self.model_name = model_name
+        self.backend = backend
+        self.system_instruction = system_instruction or ""
+
+    def _reply(self, prompt, generation_config):
+        prompt_tokens = (len(self.system_instruction) + len(prompt)) // 4 + 1
+        if generation_config and generation_config.get("response_mime_type") == "application/json":
+            questions = _NUMBERED_RE.findall(prompt.rsplit("\n\n", 1)[-1])
+            answers = [self.backend.answer(q, f"Fake answer to: {q}") for q in questions]
+            return FakeResponse(json.dumps({"answers": answers}), prompt_tokens)
+        question = prompt.rsplit("Current question: ", 1)[-1]
+        return FakeResponse(self.backend.answer(question, f"Fake answer to: {question}"), prompt_tokens)
+
+    def generate_content(self, prompt, stream=False, generation_config=None, request_options=None, **kwargs):
+        latency, error = self.backend.draw()
+        time.sleep(latency)
+        if error:
+            raise error
+        return self._reply(prompt, generation_config)
+
+    async def generate_content_async(self, prompt, generation_config=None, request_options=None, **kwargs):
+        latency, error = self.backend.draw()
+        await asyncio.sleep(latency)
+        if error:
+            raise error
+        return self._reply(prompt, generation_config)
+
+class FakeGenAI:
+    """Module-shaped stand-in for google.generativeai."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.caching = SimpleNamespace(CachedContent=SimpleNamespace(create=self._refuse_cache))
+
+    @staticmethod
+    def _refuse_cache(**kwargs):
+        raise FakeAPIError(400, "cached content is below the minimum size")
+
+    def configure(self, **kwargs):
+        pass
+
+    def get_model(self, model_name):
+        return SimpleNamespace(name=model_name)
+
+    def GenerativeModel(self, model_name, **kwargs):
+        return FakeGenerativeModel(model_name, self.backend, **kwargs)
+
+class FakeTranslator:
+    """Stands in for googletrans.Translator; translates line by line like the real service."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.client = SimpleNamespace(timeout=None)
+
+    def translate(self, text, src="en", dest="de"):
+        latency, error = self.backend.draw()
+        timeout = self.client.timeout and self.client.timeout.as_dict()["read"]
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("The read operation timed out")
+        time.sleep(latency)
+        if error:
+            raise error
+        lines = [self.backend.answer(line, f"[{dest}] {line}") for line in text.split("\n")]
+        return SimpleNamespace(text="\n".join(lines), src=src, dest=dest)
+
+def install(agent, translator_tool, llm_backend, translate_backend=None):
+    """Point the agent's lazily loaded Gemini SDK and Translator at the fakes."""
+    agent.gemini.use(FakeGenAI(llm_backend))
+    translator_tool._new_translator = lambda: FakeTranslator(translate_backend or llm_backend)
+    translator_tool._local = threading.local()
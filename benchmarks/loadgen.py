@@ -0,0 +1,110 @@
+"""Drive the Level-3 step pipeline at a target rate against fake backends.
+
+Run from the repository root:
+
+    python benchmarks/loadgen.py --qps 50 --duration 20 --llm-latency lognormal:0.8,0.4 --error-rate 0.02
+
+Questions arrive on a fixed schedule (open loop). Each one goes through
+full_agent.run_turn with the fakes from fake_backends.py in place of
+Gemini and googletrans. Latency is measured from the scheduled arrival,
+so time spent queueing behind a saturated pool is counted. Caches are
+off unless --cache is given, so every LLM step reaches the backend.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "Level-3"))
+
+import full_agent  # also puts common/ on sys.path
+import translator_tool
+from common.response_cache import ResponseCache
+from answer_index import AnswerIndex
+from bench_hotpath import generated_questions, logged_questions
+from fake_backends import FakeBackend, install
+from resilience import ResilientCaller
+
+def load_questions(path):
+    if not path:
+        return logged_questions() + generated_questions(1000)
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+def run(args):
+    llm = FakeBackend(args.llm_latency, args.error_rate, seed=args.seed)
+    translate = FakeBackend(args.translate_latency, args.error_rate, seed=args.seed + 1)
+    install(full_agent, translator_tool, llm, translate)
+    full_agent.llm_caller = ResilientCaller(full_agent.generate, retries=args.retries, base_delay=0.05)
+    full_agent.fuse_llm_steps = not args.no_fuse
+    if not args.cache:
+        full_agent.response_cache = ResponseCache(max_entries=0)
+        full_agent.answer_index = AnswerIndex(threshold=float("inf"))
+        translator_tool.MEMO_SIZE = 0
+        translator_tool._memo.clear()
+
+    questions = load_questions(args.questions)
+    total = int(args.qps * args.duration)
+    latencies = []
+    failed_turns = 0
+    step_errors = Counter()
+    lock = threading.Lock()
+
+    def turn(question, scheduled):
+        nonlocal failed_turns
+        results = full_agent.run_turn(question, "models/fake", step_pool)
+        latency = time.perf_counter() - scheduled
+        errors = Counter(result["type"] for result in results if "error" in result)
+        with lock:
+            latencies.append(latency)
+            step_errors.update(errors)
+            failed_turns += bool(errors)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as turn_pool, \
+            ThreadPoolExecutor(max_workers=args.concurrency * 4) as step_pool:
+        futures = []
+        for i in range(total):
+            scheduled = start + i / args.qps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(turn_pool.submit(turn, questions[i % len(questions)], scheduled))
+        # Turns submit steps to step_pool, so finish them before it shuts down.
+        crashed = sum(1 for future in wait(futures).done if future.exception())
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"turns        {len(latencies)} in {elapsed:.1f} s -> {len(latencies) / elapsed:.1f} turns/s "
+          f"(target {args.qps:g})")
+    print(f"latency      p50 {percentile(latencies, 0.5) * 1e3:.0f} ms  p90 {percentile(latencies, 0.9) * 1e3:.0f} ms"
+          f"  p99 {percentile(latencies, 0.99) * 1e3:.0f} ms  max {(latencies[-1] if latencies else 0) * 1e3:.0f} ms")
+    by_type = ", ".join(f"{count} {step_type}" for step_type, count in sorted(step_errors.items())) or "none"
+    print(f"failures     {failed_turns} turns with failed steps ({by_type}); {crashed} turns raised")
+    print(f"backend      gemini {llm.calls} calls ({llm.errors} injected errors), "
+          f"translator {translate.calls} calls ({translate.errors} injected errors)")
+    return latencies
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Level-3 step pipeline offline.")
+    parser.add_argument("--qps", type=float, default=20, help="question arrival rate")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of arrivals")
+    parser.add_argument("--concurrency", type=int, default=64, help="turns in flight at once")
+    parser.add_argument("--questions", metavar="PATH", help="file with one question per line")
+    parser.add_argument("--llm-latency", default="lognormal:0.8,0.4", help="fake Gemini latency spec")
+    parser.add_argument("--translate-latency", default="uniform:0.1,0.3", help="fake googletrans latency spec")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of backend calls that fail")
+    parser.add_argument("--retries", type=int, default=3, help="retries for failed Gemini calls")
+    parser.add_argument("--no-fuse", action="store_true", help="send each LLM step separately")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache and answer index on")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,173 @@
+import re
+from functools import lru_cache
+
+class CalculatorError(Exception):
+    pass
+
+# Tokens: a number (group 1), or a word (two-word operators first) or an
+# operator symbol (group 2). Anything else, such as punctuation, is skipped.
+_TOKEN_RE = re.compile(r"(\d+(?:\.\d+)?|\.\d+)|(multiplied by|divided by|[a-z]+|[-+*/×÷()])")
+
+# Infix operators, e.g. "2 plus 3".
+_INFIX_WORDS = {
+    'plus': '+', 'minus': '-', 'times': '*', 'x': '*', 'multiplied by': '*',
+    'divided by': '/', 'over': '/',
+    '+': '+', '-': '-', '*': '*', '×': '*', '/': '/', '÷': '/',
+}
+# Prefix verbs, e.g. "add 2 and 3". They also work infix ("2 add 3").
+_VERB_WORDS = {
+    'add': '+', 'sum': '+', 'subtract': '-', 'difference': '-',
+    'multiply': '*', 'product': '*', 'divide': '/', 'quotient': '/',
+}
+_SEPARATOR_WORDS = ['and', 'to', 'from', 'by', 'with']
+
+_TOKENS = {'(': ('(', '('), ')': (')', ')')}
+_TOKENS.update((word, ('op', op)) for word, op in _INFIX_WORDS.items())
+_TOKENS.update((word, ('verb', op)) for word, op in _VERB_WORDS.items())
+_TOKENS.update((word, ('sep', word)) for word in _SEPARATOR_WORDS)
+
+_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2}
+_OPERATORS = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': lambda a, b: a / b,
+}
+_END = (None, None)
+
+def _tokenize(text):
+    # Words missing from _TOKENS ("what", "is", "calculate", ...) are filler.
+    tokens = [('num', float(number)) if number else _TOKENS.get(word) for number, word in _TOKEN_RE.findall(text)]
+    tokens = [token for token in tokens if token is not None]
+    tokens.append(_END)
+    return tokens
+
+class _Parser:
+    """Precedence-climbing parser from tokens to a tuple AST.
+
+    Nodes are ('num', value), ('neg', operand) or (operator, left, right).
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def take(self):
+        token = self.tokens[self.pos]
+        if token is not _END:
+            self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.expression(1)
+        if self.tokens[self.pos] is not _END:
+            raise CalculatorError("Sorry, I couldn't understand the calculation.")
+        return node
+
+    def expression(self, min_precedence):
+        tokens = self.tokens
+        kind, value = tokens[self.pos]
+        if kind == 'num':  # the common case, without a call to unary()
+            self.pos += 1
+            node = ('num', value)
+        else:
+            node = self.unary()
+        while True:
+            kind, op = tokens[self.pos]
+            if (kind != 'op' and kind != 'verb') or _PRECEDENCE[op] < min_precedence:
+                return node
+            self.pos += 1
+            node = (op, node, self.expression(_PRECEDENCE[op] + 1))
+
+    def unary(self):
+        kind, value = self.take()
+        if kind == 'num':
+            return ('num', value)
+        if kind == 'op' and (value == '+' or value == '-'):
+            operand = self.unary()
+            return ('neg', operand) if value == '-' else operand
+        if kind == '(':
+            node = self.expression(1)
+            if self.take()[0] != ')':
+                raise CalculatorError("Sorry, I couldn't understand the calculation: missing ')'.")
+            return node
+        if kind == 'verb':
+            # "add 2 and 3", "subtract 3 from 10", "divide 10 by 2"
+            left = self.expression(1)
+            sep_kind, sep = self.take()
+            if sep_kind != 'sep':
+                raise CalculatorError("Sorry, I couldn't understand the calculation.")
+            right = self.expression(1)
+            if value == '-' and sep == 'from':
+                left, right = right, left
+            node = (value, left, right)
+            # "multiply 3 by 4 by 5", "add 2 and 3 and 4", but not "add 2 and 3 and multiply ..."
+            while self.tokens[self.pos][0] == 'sep' and self.tokens[self.pos + 1][0] != 'verb':
+                self.pos += 1
+                node = (value, node, self.expression(1))
+            return node
+        raise CalculatorError("Sorry, I couldn't understand the calculation.")
+
+# A maximal arithmetic run in free text: numbers or parenthesised numbers
+# joined by operators ("2 + 3 * 4", "(2+3)*4", "10 minus 2 minus 3"), or a
+# verb form whose operands may be runs themselves ("add 2 and 3 + 4").
+_NUMBER_TEXT = r"(?:\d+(?:\.\d+)?|\.\d+)"
+_OPERAND = rf"\(*\s*-?\s*{_NUMBER_TEXT}(?:\s*\))*"
+_INFIX = r"(?:[-+*/×÷x]|\b(?:plus|minus|times|over|multiplied\s+by|divided\s+by)\b)"
+_RUN = rf"{_OPERAND}(?:\s*{_INFIX}\s*{_OPERAND})*"
+_VERB = r"\b(?:add|sum|subtract|difference|multiply|product|divide|quotient)\b(?:\s+of)?"
+_SEPARATOR = r"\b(?:and|to|from|by|with)\b"
+CALCULATION_RE = re.compile(
+    rf"{_VERB}\s+{_RUN}(?:\s+{_SEPARATOR}\s+{_RUN})+|{_OPERAND}(?:\s*{_INFIX}\s*{_OPERAND})+", re.IGNORECASE)
+
+def calculation_spans(text: str) -> list[str]:
+    """Return each whole calculation in text, in order of appearance."""
+    return [match.group().strip() for match in CALCULATION_RE.finditer(text)]
+
+# The two-operand shapes most questions take, compiled straight to an AST
+# without the tokenizer and parser: "12 + 3", "what is 5 plus 3?",
+# "add 2 and 3", "subtract 3 from 10". Text is already normalized.
+_SIMPLE_RE = re.compile(
+    r"(?:what is |calculate |compute )?(\d+(?:\.\d+)?) ?(plus|minus|times|x|multiplied by|divided by|over|[-+*/×÷])"
+    r" ?(\d+(?:\.\d+)?) ?[?.]?"
+    r"|(add|subtract|multiply|divide) (\d+(?:\.\d+)?) (and|to|from|by|with) (\d+(?:\.\d+)?) ?[?.]?")
+
+@lru_cache(maxsize=1024)
+def compile_expression(text: str) -> tuple:
+    """Compile the calculation in normalized text into an AST; cached by text.
+
+    Stray words around the calculation are ignored ("I have 3 apples, add
+    2 and 5"). Text holding several calculations compiles the first one.
+    """
+    match = _SIMPLE_RE.fullmatch(text)
+    if match is None:
+        spans = calculation_spans(text)
+        if len(spans) > 1:
+            return compile_expression(spans[0])
+        try:
+            return _Parser(_tokenize(text)).parse()
+        except CalculatorError:
+            if not spans or spans[0] == text:
+                raise
+            return compile_expression(spans[0])
+    a, op, b, verb, c, sep, d = match.groups()
+    if a is not None:
+        return (_INFIX_WORDS[op], ('num', float(a)), ('num', float(b)))
+    left, right = ('num', float(c)), ('num', float(d))
+    if verb == 'subtract' and sep == 'from':
+        left, right = right, left
+    return (_VERB_WORDS[verb], left, right)
+
+def evaluate(node) -> float:
+    kind = node[0]
+    if kind == 'num':
+        return node[1]
+    if kind == 'neg':
+        return -evaluate(node[1])
+    left, right = evaluate(node[1]), evaluate(node[2])
+    if kind == '/' and right == 0:
+        raise CalculatorError("Sorry, I can't divide by zero.")
+    return _OPERATORS[kind](left, right)
+
+def parse_and_calculate(question: str) -> float:
+    return float(evaluate(compile_expression(" ".join(question.lower().split()))))
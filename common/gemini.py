@@ -0,0 +1,115 @@
+import os
+import threading
+
+from common.response_cache import ResponseCache
+from common.token_usage import TokenUsage
+
+DEFAULT_MODEL = 'models/gemini-1.5-pro'
+
+class GeminiClient:
+    """google.generativeai, imported and configured on first use, and one
+    long-lived GenerativeModel per model name, plus the response cache and
+    token counts of the calls made through it.
+
+    The SDK import alone takes most of a second, so configure() pays for it
+    on a warm-up thread while the user types the first question. The system
+    prompt is set once as each model's system_instruction instead of being
+    prepended to every question. `make_model(genai, model_name)` may build
+    the model some other way, or return None for the default.
+    """
+
+    def __init__(self, system_prompt, make_model=None):
+        self.system_prompt = system_prompt
+        self.api_key = None
+        self._make_model = make_model
+        self._module = None
+        self._models = {}
+        self._lock = threading.Lock()
+        self._warm_up = None
+        self._warm_up_error = None
+        self.response_cache = ResponseCache()
+        self.token_usage = TokenUsage()
+
+    def load(self):
+        with self._lock:
+            if self._module is None:
+                import google.generativeai as genai
+                genai.configure(api_key=self.api_key)
+                self._module = genai
+            return self._module
+
+    def use(self, module):
+        """Use module in place of google.generativeai, e.g. a fake for benchmarks."""
+        with self._lock:
+            self._module = module
+            self._models.clear()
+
+    def model(self, model_name, system_prompt=None):
+        """Return the GenerativeModel for model_name, shared by every call.
+        `system_prompt` replaces the client's own for this model."""
+        key = model_name if system_prompt is None else (model_name, system_prompt)
+        if key not in self._models:
+            genai = self.load()
+            model = self._make_model(genai, model_name) if self._make_model and system_prompt is None else None
+            self._models[key] = model or genai.GenerativeModel(
+                model_name, system_instruction=system_prompt or self.system_prompt)
+        return self._models[key]
+
+    def configure(self, api_key, model_name):
+        """Set the API key and start checking it and the model in the background."""
+        self.api_key = api_key
+        self._warm_up = threading.Thread(target=self._check, args=(model_name,), daemon=True)
+        self._warm_up.start()
+
+    def configure_from_env(self, model_name=DEFAULT_MODEL):
+        """Read .env, build the response cache and configure() with GEMINI_API_KEY."""
+        import dotenv
+        dotenv.load_dotenv()
+        self.response_cache = ResponseCache.from_env()
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("API key not found. Please set GEMINI_API_KEY in .env file or environment variables.")
+        self.configure(api_key, model_name)
+        return model_name
+
+    def _check(self, model_name):
+        # Looks the model up without paying for a generation.
+        try:
+            self.load().get_model(model_name)
+            self.model(model_name)
+        except Exception as e:
+            self._warm_up_error = e
+
+    def wait_for_warm_up(self):
+        """Block on the warm-up once; report its failure to the first caller."""
+        thread = self._warm_up
+        if thread is None:
+            return
+        thread.join()
+        self._warm_up = None
+        error, self._warm_up_error = self._warm_up_error, None
+        if error:
+            raise ValueError(f"Health check failed: {error}")
+
+    def stream(self, question, model_name):
+        """Yield the answer to question chunk by chunk, from the cache if it has it."""
+        key = ResponseCache.make_key(question, model_name, self.system_prompt)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        try:
+            self.wait_for_warm_up()
+            response = self.model(model_name).generate_content(
+                question, stream=True, request_options={"timeout": 10})
+            parts = []
+            for chunk in response:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+            self.token_usage.record(response)
+            if not parts:
+                raise ValueError("Received empty response from API")
+            self.response_cache.set(key, "".join(parts))
+        except Exception as e:
+            raise Exception(f"API Error: {str(e)}")
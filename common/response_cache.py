@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+class ResponseCache:
+    """LRU cache of LLM answers with a TTL and optional persistence to a JSON file."""
+
+    def __init__(self, max_entries=256, ttl=3600, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache from RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL and RESPONSE_CACHE_FILE."""
+        return cls(
+            max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+            path=os.getenv("RESPONSE_CACHE_FILE") or None,
+        )
+
+    @staticmethod
+    def make_key(question, model_name, system_prompt):
+        normalized = " ".join(question.lower().split()).rstrip("?.! ")
+        prompt_hash = hashlib.sha1(system_prompt.encode("utf-8")).hexdigest()[:12]
+        return f"{model_name}|{prompt_hash}|{normalized}"
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.path:
+                self._save()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, value, expires in saved:
+            if expires > now:
+                self._entries[key] = (value, expires)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump([[key, value, expires] for key, (value, expires) in self._entries.items()], f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,36 @@
+import threading
+from termcolor import colored
+
+class Spinner:
+    """Animate "Thinking..." on a background thread until stop() is called."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._spin, daemon=True)
+
+    def _spin(self):
+        frames = ['|', '/', '-', '\\']
+        i = 0
+        while not self._stop.wait(0.1):
+            print(f"\b{frames[i % 4]}", end='', flush=True)
+            i += 1
+
+    def start(self):
+        print(colored("\nThinking...", 'yellow'), end='', flush=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+
+def print_streamed(chunks, spinner):
+    """Stop the spinner once the first chunk lands, then print chunks as they come."""
+    first_chunk = next(chunks)
+    spinner.stop()
+    print("\b" + colored("\nAssistant:", 'green'))
+    print(first_chunk, end='', flush=True)
+    for chunk in chunks:
+        print(chunk, end='', flush=True)
+    print()
@@ -0,0 +1,49 @@
+import threading
+
+class TokenUsage:
+    """Running totals of the token counts Gemini reports in usage_metadata."""
+
+    FIELDS = ("prompt_token_count", "cached_content_token_count", "candidates_token_count", "total_token_count")
+
+    def __init__(self):
+        self.calls = 0
+        self.totals = dict.fromkeys(self.FIELDS, 0)
+        self.last = None
+        self._lock = threading.Lock()
+
+    def record(self, response):
+        """Add one response's counts; returns them, or None if the response has no usage_metadata."""
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is None:
+            return None
+        counts = {field: int(getattr(metadata, field, 0) or 0) for field in self.FIELDS}
+        with self._lock:
+            self.calls += 1
+            for field, count in counts.items():
+                self.totals[field] += count
+            self.last = counts
+        return counts
+
+    def stats(self):
+        with self._lock:
+            calls = self.calls
+            totals = dict(self.totals)
+            last = self.last
+        return {
+            "calls": calls,
+            **totals,
+            "avg_prompt_tokens": totals["prompt_token_count"] / calls if calls else 0.0,
+            "last": last,
+        }
+
+    def format(self):
+        stats = self.stats()
+        if not stats["calls"]:
+            return "Tokens: no Gemini calls yet."
+        text = (f"Tokens: {stats['calls']} calls, {stats['prompt_token_count']} prompt "
+                f"({stats['cached_content_token_count']} from context cache), "
+                f"{stats['candidates_token_count']} output, {stats['total_token_count']} total; "
+                f"{stats['avg_prompt_tokens']:.0f} prompt tokens per call")
+        last = stats["last"]
+        return text + (f"\nLast call: {last['prompt_token_count']} prompt, "
+                       f"{last['candidates_token_count']} output")